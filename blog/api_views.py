@@ -1,11 +1,13 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from mywebsite.conditional import ConditionalGetMixin
+from mywebsite.sparse_fields import SparseFieldsViewMixin
 from .models import Category, Post
 from .serializers import CategorySerializer, PostSerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -15,8 +17,8 @@ class CategoryViewSet(viewsets.ModelViewSet):
     ordering = ['name']
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+class PostViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Post.objects.select_related('author', 'category')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -24,6 +26,8 @@ class PostViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['created_at', 'updated_at', 'published_at']
     ordering = ['-created_at']
+    cursor_ordering = '-created_at'
+    conditional_related = ('author', 'category')
 
     def get_queryset(self):
         queryset = super().get_queryset()
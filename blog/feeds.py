@@ -0,0 +1,85 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from mywebsite.feeds import FEED_ITEMS, StoredFeedMixin
+from .models import Category, Post
+
+
+class LatestPostsFeed(StoredFeedMixin, Feed):
+    """RSS feed of the latest published posts."""
+    feed_group = 'blog'
+    title = 'Blog - Vân Nguyễn'
+    description = 'Bài viết mới trên blog'
+
+    def feed_name(self, request, *args, **kwargs):
+        return f'posts:{self.feed_type.__name__}'
+
+    def link(self):
+        return reverse('blog:post_list')
+
+    def published_posts(self):
+        return (
+            Post.objects.filter(status='published')
+            .select_related('author', 'category')
+            .order_by('-published_at', '-created_at')
+        )
+
+    def items(self):
+        return self.published_posts()[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        # The stored rendering; feeds never run markdown
+        return item.rendered_html or item.excerpt
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.slug])
+
+    def item_pubdate(self, item):
+        return item.published_at or item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    """RSS feed of the latest published posts in one category."""
+
+    def feed_name(self, request, category_slug):
+        return f'category:{category_slug}:{self.feed_type.__name__}'
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(Category, slug=category_slug)
+
+    def title(self, obj):
+        return f'{obj.name} - Blog'
+
+    def description(self, obj):
+        return obj.description or f'Bài viết mới trong {obj.name}'
+
+    def link(self, obj):
+        return reverse('blog:post_list_by_category', args=[obj.slug])
+
+    def items(self, obj):
+        return self.published_posts().filter(category=obj)[:FEED_ITEMS]
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
@@ -1,8 +1,11 @@
 from django import forms
+from mywebsite.slugs import SlugAllocationMixin
 from .models import Post, Category
 
 
-class CategoryForm(forms.ModelForm):
+class CategoryForm(SlugAllocationMixin, forms.ModelForm):
+    slug_source_field = 'name'
+
     class Meta:
         model = Category
         fields = ['name', 'slug', 'description']
@@ -16,7 +19,7 @@ class CategoryForm(forms.ModelForm):
         }
 
 
-class PostForm(forms.ModelForm):
+class PostForm(SlugAllocationMixin, forms.ModelForm):
     class Meta:
         model = Post
         fields = ['title', 'slug', 'category', 'content', 'excerpt', 'status', 'published_at']
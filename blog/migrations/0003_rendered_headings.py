@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='rendered_headings',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
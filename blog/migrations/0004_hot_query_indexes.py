@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_rendered_headings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='post_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_at'], name='post_status_published_idx'),
+        ),
+    ]
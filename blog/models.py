@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from mywebsite.rendering import RenderedMarkdownModel
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -14,7 +15,7 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
-class Post(models.Model):
+class Post(RenderedMarkdownModel):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('published', 'Published'),
@@ -33,6 +34,12 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Public list, status counters and anonymous keyset pages
+            models.Index(fields=['status', 'created_at', 'id'], name='post_status_created_idx'),
+            # Homepage "recent posts"
+            models.Index(fields=['status', 'published_at'], name='post_status_published_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -1,18 +1,18 @@
 from rest_framework import serializers
+from mywebsite.sparse_fields import SparseFieldsSerializerMixin
 from .models import Category, Post
-import markdown
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'created_at']
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.username', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
-    content_html = serializers.SerializerMethodField()
+    content_html = serializers.CharField(source='get_content_html', read_only=True)
 
     class Meta:
         model = Post
@@ -22,9 +22,9 @@ class PostSerializer(serializers.ModelSerializer):
             'excerpt', 'status', 'created_at', 'updated_at', 'published_at'
         ]
         read_only_fields = ['author']
-
-    def get_content_html(self, obj):
-        return markdown.markdown(obj.content, extensions=['extra', 'codehilite'])
+        # Rendering is the expensive part of a list page; clients ask for it
+        list_opt_in_fields = ['content_html']
+        field_dependencies = {'content_html': ['content', *Post.RENDERED_FIELDS]}
 
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
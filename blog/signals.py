@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from mywebsite.conditional import invalidate_related_names
+from mywebsite.dashboard import invalidate_dashboard_stats
+from mywebsite.feeds import invalidate_feeds
+from mywebsite.page_cache import invalidate_blog_lists, invalidate_post_pages
+from .models import Category, Post
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(pre_save, sender=Post)
+def remember_public_state(sender, instance, **kwargs):
+    # Status and slug as stored, to tell an unpublish or a rename on save
+    instance._stored_state = None
+    if instance.pk:
+        instance._stored_state = Post.objects.filter(pk=instance.pk).values_list('status', 'slug').first()
+
+
+@receiver(post_save, sender=Post)
+def refresh_public_post(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_state', None)
+    was_published = stored is not None and stored[0] == 'published'
+    # Edits to a draft that stays a draft are invisible to anonymous visitors
+    if instance.status == 'published' or was_published:
+        invalidate_blog_lists()
+        invalidate_post_pages(instance.slug, stored[1] if stored else None)
+        invalidate_feeds('blog')
+
+
+@receiver(post_delete, sender=Post)
+def drop_public_post(sender, instance, **kwargs):
+    if instance.status == 'published':
+        invalidate_blog_lists()
+        invalidate_post_pages(instance.slug)
+        invalidate_feeds('blog')
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def refresh_category(sender, instance, **kwargs):
+    # Post pages show the category name; on delete the posts are looked up
+    # before their category is cleared
+    invalidate_blog_lists()
+    invalidate_feeds('blog')
+    if not kwargs.get('created'):
+        invalidate_post_pages(*instance.posts.filter(status='published').values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_related_names(sender, **kwargs):
+    # API ETags carry category_name and author/user names; a login only
+    # writes last_login
+    if kwargs.get('update_fields') == {'last_login'}:
+        return
+    invalidate_related_names(sender)
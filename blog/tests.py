@@ -1,3 +1,51 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Category, Post
+
+
+class PostApiConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer')
+        cls.category = Category.objects.create(name='Django', slug='django')
+        cls.post = Post.objects.create(
+            title='Hello', slug='hello', author=cls.author, category=cls.category,
+            content='Hello world.', status='published',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_detail_etag_follows_category_and_author_names(self):
+        url = reverse('post-detail', args=[self.post.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.category.name = 'Web'
+        self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['category_name'], 'Web')
+
+        etag = response['ETag']
+        self.author.username = 'editor'
+        self.author.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['author_name'], 'editor')
+
+
+class PostPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer')
+        cls.post = Post.objects.create(
+            title='Hello', slug='hello', author=cls.author, content='# Hello\n\nFirst post.', status='published',
+        )
+
+    def test_post_page_renders(self):
+        response = self.client.get(reverse('blog:post_detail', args=[self.post.slug]))
+        self.assertContains(response, 'First post.')
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -19,6 +19,12 @@ urlpatterns = [
     path('category/<int:pk>/edit/', views.CategoryUpdateView.as_view(), name='category_update'),
     path('category/<int:pk>/delete/', views.CategoryDeleteView.as_view(), name='category_delete'),
     path('category/<slug:category_slug>/', views.PublicBlogListView.as_view(), name='post_list_by_category'),
+    path('category/<slug:category_slug>/feed/', feeds.CategoryPostsFeed(), name='category_feed'),
+    path('category/<slug:category_slug>/feed/atom/', feeds.CategoryPostsAtomFeed(), name='category_feed_atom'),
+
+    # Feeds
+    path('feed/', feeds.LatestPostsFeed(), name='post_feed'),
+    path('feed/atom/', feeds.LatestPostsAtomFeed(), name='post_feed_atom'),
     
     # Public Blog (generic paths last)
     path('', views.PublicBlogListView.as_view(), name='post_list'),
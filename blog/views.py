@@ -1,12 +1,21 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.views import View
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from .models import Post, Category
 from .forms import PostForm, CategoryForm
-import markdown
+from mywebsite.page_cache import anonymous_page_cache, lists_scope, post_scope
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from mywebsite.aio import alist, apaginate
+from mywebsite.conditional import conditional_page, make_etag
 
 
 # Admin Blog Management - All posts with CRUD
@@ -36,10 +45,11 @@ class AdminBlogListView(LoginRequiredMixin, ListView):
 
 
 # Public Blog - Only published posts
-class PublicBlogListView(ListView):
-    model = Post
+@method_decorator(anonymous_page_cache(lists_scope), name='get')
+class PublicBlogListView(View):
+    """Async list of published posts. The page, its count, the category list
+    and the current category are independent queries and awaited together."""
     template_name = 'blog/post_list.html'
-    context_object_name = 'posts'
     paginate_by = 10
 
     def get_queryset(self):
@@ -49,38 +59,82 @@ class PublicBlogListView(ListView):
             queryset = queryset.filter(category__slug=category_slug)
         return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+    async def get_current_category(self):
         category_slug = self.kwargs.get('category_slug')
-        if category_slug:
-            context['current_category'] = get_object_or_404(Category, slug=category_slug)
-        return context
+        if not category_slug:
+            return None
+        try:
+            return await Category.objects.aget(slug=category_slug)
+        except Category.DoesNotExist:
+            raise Http404('No category matches the given query.')
+
+    async def get(self, request, *args, **kwargs):
+        page_number = self.kwargs.get('page') or request.GET.get('page')
+        (paginator, page_obj), categories, current_category = await asyncio.gather(
+            apaginate(self.get_queryset(), self.paginate_by, page_number, strict=True),
+            alist(Category.objects.all()),
+            self.get_current_category(),
+        )
+        context = {
+            'view': self,
+            'posts': page_obj.object_list,
+            'object_list': page_obj.object_list,
+            'paginator': paginator,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
+            'categories': categories,
+        }
+        if current_category is not None:
+            context['current_category'] = current_category
+        return TemplateResponse(request, self.template_name, context)
 
 
 # Backward compatibility alias
 PostListView = PublicBlogListView
 
 
-class PostDetailView(DetailView):
-    model = Post
+async def post_detail_validators(request, slug):
+    """Validators for the public post page: the post, the names it shows and
+    the visitor (the navigation differs once logged in).
+
+    Only an ETag: renaming the category or author leaves ``updated_at``
+    where it was."""
+    user = await request.auser()
+    posts = Post.objects.filter(slug=slug)
+    if not user.is_authenticated:
+        posts = posts.filter(status='published')
+    row = await posts.values_list('updated_at', 'category__name', 'author__username').afirst()
+    if row is None:
+        return None
+    updated_at, category_name, author_name = row
+    etag = make_etag('post', slug, user.pk, updated_at.isoformat(), category_name, author_name)
+    return etag, None
+
+
+@method_decorator([anonymous_page_cache(post_scope), conditional_page(post_detail_validators)], name='get')
+class PostDetailView(View):
     template_name = 'blog/post_detail.html'
-    context_object_name = 'post'
 
-    def get_queryset(self):
+    def get_queryset(self, user):
         queryset = Post.objects.select_related('author', 'category')
-        if not self.request.user.is_authenticated:
+        if not user.is_authenticated:
             queryset = queryset.filter(status='published')
         return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        post = self.get_object()
-        context['content_html'] = markdown.markdown(
-            post.content,
-            extensions=['extra', 'codehilite', 'toc']
-        )
-        return context
+    async def get(self, request, slug):
+        user = await request.auser()
+        try:
+            post = await self.get_queryset(user).aget(slug=slug)
+        except Post.DoesNotExist:
+            raise Http404('No post found matching the query')
+        # A stale stored rendering is refreshed with an UPDATE, so run it in a thread
+        content_html = await sync_to_async(post.get_content_html)()
+        return TemplateResponse(request, self.template_name, {
+            'view': self,
+            'object': post,
+            'post': post,
+            'content_html': content_html,
+        })
 
 
 # Post CRUD Views
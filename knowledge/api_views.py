@@ -1,14 +1,37 @@
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count
 from django_filters.rest_framework import DjangoFilterBackend
+from mywebsite.conditional import ConditionalGetMixin
+from mywebsite.sparse_fields import SparseFieldsViewMixin
 from .models import Topic, KnowledgeEntry, Resource
-from .serializers import TopicSerializer, KnowledgeEntrySerializer, ResourceSerializer
+from .serializers import (
+    TopicSerializer, KnowledgeEntrySerializer, ResourceSerializer, EntryReorderSerializer, EntryImportSerializer,
+)
+from .importer import MarkdownImporter, ZipSource
+from .exporter import iter_markdown_zip, iter_ndjson
+from .sidebar import invalidate_sidebar
+from .search import FullTextSearchFilter
+
+
+MAX_REORDER_CHANGES = 1000
 
+# ?as= value -> (generator, content type, file extension) for the export
+EXPORTERS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'zip': (iter_markdown_zip, 'application/zip', 'zip'),
+}
 
-class TopicViewSet(viewsets.ModelViewSet):
-    queryset = Topic.objects.all()
+
+class TopicViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Topic.objects.select_related('parent').annotate(subtopics_total=Count('subtopics'))
     serializer_class = TopicSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -18,17 +41,20 @@ class TopicViewSet(viewsets.ModelViewSet):
     ordering = ['name']
 
 
-class KnowledgeEntryViewSet(viewsets.ModelViewSet):
+class KnowledgeEntryViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = KnowledgeEntrySerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Full-text search runs last so it can keep relevance order without ?ordering=
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['entry_type', 'topic', 'is_favorite']
     search_fields = ['title', 'content', 'tags', 'summary']
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-updated_at']
+    cursor_ordering = '-updated_at'
+    conditional_related = ('user', 'topic')
 
     def get_queryset(self):
-        return KnowledgeEntry.objects.filter(user=self.request.user)
+        return KnowledgeEntry.objects.filter(user=self.request.user).select_related('user', 'topic')
 
     @action(detail=True, methods=['patch'], url_path='reorder')
     def reorder(self, request, pk=None):
@@ -44,19 +70,102 @@ class KnowledgeEntryViewSet(viewsets.ModelViewSet):
                 entry.parent = None
             else:
                 try:
-                    entry.parent_id = int(new_parent)
-                except (ValueError, TypeError):
+                    parent = KnowledgeEntry.objects.only('id', 'tree_path').get(
+                        pk=int(new_parent), user=request.user
+                    )
+                except (ValueError, TypeError, KnowledgeEntry.DoesNotExist):
                     return Response(
                         {'error': 'Invalid parent ID'},
                         status=status.HTTP_400_BAD_REQUEST
                     )
-        
+                if parent.is_descendant_of(entry):
+                    return Response(
+                        {'error': 'An entry cannot be moved under itself or one of its descendants.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                entry.parent_id = parent.pk
+
         entry.save()
         serializer = self.get_serializer(entry)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='reorder')
+    def bulk_reorder(self, request):
+        """Apply a list of {id, order, parent} changes from a drag-and-drop edit"""
+        serializer = EntryReorderSerializer(
+            data=request.data, many=True, allow_empty=False, max_length=MAX_REORDER_CHANGES
+        )
+        serializer.is_valid(raise_exception=True)
+        ids = [change['id'] for change in serializer.validated_data]
+        if len(ids) != len(set(ids)):
+            return Response(
+                {'error': 'Each entry may appear only once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            entries = KnowledgeEntry.objects.filter(user=request.user)
+            updated, moved = entries.reorder(serializer.validated_data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_update sends no post_save, so the sidebar cache is dropped here
+        if updated:
+            invalidate_sidebar(request.user.id)
+        return Response({'updated': updated, 'moved': moved})
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_archive(self, request):
+        """Import a zip of markdown files; folders become parent pages"""
+        serializer = EntryImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        parent = None
+        if data.get('parent') is not None:
+            parent = self.get_queryset().filter(pk=data['parent']).first()
+            if parent is None:
+                return Response({'error': 'Invalid parent ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Large uploads are spooled to a temporary file, so the archive is
+        # read from disk member by member
+        try:
+            source = ZipSource(data['file'])
+        except zipfile.BadZipFile:
+            return Response({'error': 'The file is not a zip archive'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = MarkdownImporter(
+                request.user, parent=parent, topic=data.get('topic'), status=data['status'],
+            ).run(source)
+        finally:
+            source.close()
+
+        return Response(
+            {
+                'created': result['created'],
+                'folders': result['folders'],
+                'skipped': [{'path': path, 'reason': reason} for path, reason in result['skipped']],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """Stream all topics, entries and resources as NDJSON, or ?as=zip for markdown"""
+        archive = request.query_params.get('as', 'ndjson')
+        if archive not in EXPORTERS:
+            return Response(
+                {'error': 'Unknown export format, use ndjson or zip'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        stream, content_type, extension = EXPORTERS[archive]
+        response = StreamingHttpResponse(stream(request.user), content_type=content_type)
+        filename = f'knowledge-{request.user.username}-{timezone.localdate():%Y%m%d}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
 
-class ResourceViewSet(viewsets.ModelViewSet):
+class ResourceViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = ResourceSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -64,6 +173,8 @@ class ResourceViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'author', 'notes']
     ordering_fields = ['created_at', 'updated_at', 'rating']
     ordering = ['-created_at']
+    cursor_ordering = '-updated_at'
+    conditional_related = ('user', 'topic')
 
     def get_queryset(self):
-        return Resource.objects.filter(user=self.request.user)
+        return Resource.objects.filter(user=self.request.user).select_related('user', 'topic')
@@ -0,0 +1,166 @@
+"""
+Streaming export of a user's knowledge base.
+
+``iter_ndjson()`` yields one JSON object per line (topics, then entries in
+tree order, then resources) and ``iter_markdown_zip()`` yields a zip with
+one markdown file per entry, laid out the way ``knowledge.importer`` reads
+it back: an entry with children becomes a folder whose ``index.md`` holds
+the entry itself, and the fields that are not content go in front matter.
+
+Rows are walked with ``iterator(chunk_size=...)`` and written out as they
+arrive, so memory use stays flat however large the account is. Both
+generators are meant for ``StreamingHttpResponse`` or a file.
+"""
+
+import json
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import KnowledgeEntry, Resource, Topic
+
+
+# Rows per fetch; entry rows carry full markdown, so keep the batches small
+EXPORT_CHUNK_SIZE = 200
+
+TOPIC_FIELDS = ['id', 'name', 'slug', 'description', 'parent', 'created_at']
+ENTRY_FIELDS = [
+    'id', 'parent', 'topic', 'title', 'slug', 'entry_type', 'status', 'order', 'content',
+    'summary', 'source_url', 'tags', 'is_favorite', 'created_at', 'updated_at',
+]
+RESOURCE_FIELDS = [
+    'id', 'topic', 'title', 'resource_type', 'url', 'author', 'status', 'notes', 'rating',
+    'created_at', 'updated_at',
+]
+
+# File names the importer would take for a folder page
+_RESERVED_STEMS = ('index', 'readme', '_index')
+
+
+def _json_line(record_type, values):
+    return json.dumps({'type': record_type, **values}, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def iter_ndjson(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """NDJSON lines of ``{"type": "topic"|"entry"|"resource", ...}``."""
+    # Topics are shared by all users and few, so all of them are exported
+    for values in Topic.objects.order_by('pk').values(*TOPIC_FIELDS).iterator(chunk_size=chunk_size):
+        yield _json_line('topic', values)
+    entries = KnowledgeEntry.objects.filter(user=user).order_by('tree_path', 'pk')
+    for values in entries.values(*ENTRY_FIELDS).iterator(chunk_size=chunk_size):
+        yield _json_line('entry', values)
+    resources = Resource.objects.filter(user=user).order_by('pk')
+    for values in resources.values(*RESOURCE_FIELDS).iterator(chunk_size=chunk_size):
+        yield _json_line('resource', values)
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands its bytes back on ``pop()``.
+
+    It has no ``tell``/``seek``, so ``zipfile`` writes in streaming mode.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _yaml_value(value):
+    # A JSON scalar is also a valid YAML flow scalar
+    return json.dumps(value, ensure_ascii=False)
+
+
+def entry_markdown(values):
+    """Front matter plus content for one exported entry."""
+    meta = {
+        'title': values['title'],
+        'topic': values['topic__name'],
+        'tags': [tag.strip() for tag in values['tags'].split(',') if tag.strip()],
+        'status': values['status'],
+        'type': values['entry_type'],
+        'order': values['order'],
+        'summary': values['summary'],
+        'source_url': values['source_url'],
+        'favorite': values['is_favorite'],
+    }
+    lines = ['---']
+    for key, value in meta.items():
+        if value in (None, '', []):
+            continue
+        if isinstance(value, list):
+            value = '[%s]' % ', '.join(_yaml_value(item) for item in value)
+        elif isinstance(value, bool):
+            value = 'true' if value else 'false'
+        else:
+            value = _yaml_value(value)
+        lines.append(f'{key}: {value}')
+    lines += ['---', '', values['content']]
+    return '\n'.join(lines)
+
+
+def _file_stem(slug):
+    return f'{slug}-page' if slug.lower() in _RESERVED_STEMS else slug
+
+
+def _zip_info(name, modified):
+    info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def iter_markdown_zip(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Bytes of a zip archive of the user's entries, plus resources.ndjson.
+
+    Entries are read in ``tree_path`` order, which is depth-first, so the
+    folder of each entry is known from a stack of its ancestors' slugs. One
+    row of look-ahead tells whether an entry has children. The only state
+    that grows is the archive's central directory, one small record per file.
+    """
+    buffer = _ChunkBuffer()
+    archive = zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED)
+    entries = (
+        KnowledgeEntry.objects.filter(user=user)
+        .order_by('tree_path', 'pk')
+        .values('tree_path', 'topic__name', *ENTRY_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    stack = []  # (tree_path, folder name) of the current entry's ancestors
+    current = next(entries, None)
+    while current is not None:
+        following = next(entries, None)
+        path = current['tree_path']
+        while stack and not path.startswith(stack[-1][0]):
+            stack.pop()
+        folder = '/'.join(name for _path, name in stack)
+        prefix = f'{folder}/' if folder else ''
+
+        has_children = bool(path) and following is not None and following['tree_path'].startswith(path)
+        stem = _file_stem(current['slug'])
+        if has_children:
+            name = f'{prefix}{stem}/index.md'
+            stack.append((path, stem))
+        else:
+            name = f'{prefix}{stem}.md'
+        archive.writestr(_zip_info(name, current['updated_at']), entry_markdown(current).encode('utf-8'))
+        yield buffer.pop()
+        current = following
+
+    resources = Resource.objects.filter(user=user).order_by('pk').values(*RESOURCE_FIELDS)
+    with archive.open('resources.ndjson', 'w') as member:
+        for values in resources.iterator(chunk_size=chunk_size):
+            member.write(_json_line('resource', values))
+            yield buffer.pop()
+    archive.close()
+    yield buffer.pop()
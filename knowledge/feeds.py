@@ -0,0 +1,53 @@
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from mywebsite.feeds import FEED_ITEMS, StoredFeedMixin
+from .models import KnowledgeEntry
+
+
+class PublicEntriesFeed(StoredFeedMixin, Feed):
+    """RSS feed of the most recently updated public knowledge entries."""
+    feed_group = 'knowledge'
+    title = 'Note-Taking - Vân Nguyễn'
+    description = 'Ghi chú và kiến thức mới cập nhật'
+
+    def feed_name(self, request, *args, **kwargs):
+        return f'entries:{self.feed_type.__name__}'
+
+    def link(self):
+        return reverse('note_taking')
+
+    def items(self):
+        return (
+            KnowledgeEntry.objects.filter(status='public')
+            .select_related('user', 'topic')
+            .order_by('-updated_at')[:FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        # The stored rendering; feeds never run markdown
+        return item.rendered_html or item.summary
+
+    def item_link(self, item):
+        return reverse('knowledge:entry_detail', args=[item.slug])
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.user.username
+
+    def item_categories(self, item):
+        tags = [tag.strip() for tag in item.tags.split(',') if tag.strip()]
+        return ([item.topic.name] if item.topic else []) + tags
+
+
+class PublicEntriesAtomFeed(PublicEntriesFeed):
+    feed_type = Atom1Feed
+    subtitle = PublicEntriesFeed.description
@@ -1,9 +1,11 @@
 from django import forms
-from django.utils.text import slugify
+from mywebsite.slugs import SlugAllocationMixin
 from .models import Topic, KnowledgeEntry, Resource
 
 
-class TopicForm(forms.ModelForm):
+class TopicForm(SlugAllocationMixin, forms.ModelForm):
+    slug_source_field = 'name'
+
     class Meta:
         model = Topic
         fields = ['name', 'slug', 'description', 'parent']
@@ -18,12 +20,18 @@ class TopicForm(forms.ModelForm):
         }
 
 
-class KnowledgeEntryForm(forms.ModelForm):
+class KnowledgeEntryForm(SlugAllocationMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if self.user:
-            self.fields['parent'].queryset = KnowledgeEntry.objects.filter(user=self.user).order_by('title')
+            parent_choices = KnowledgeEntry.objects.filter(user=self.user).order_by('title')
+            if self.instance.pk and self.instance.tree_path:
+                # An entry cannot be nested under itself or its own descendants
+                parent_choices = parent_choices.exclude(
+                    pk__in=KnowledgeEntry.objects.subtree(self.instance).values('pk')
+                )
+            self.fields['parent'].queryset = parent_choices
         if 'content' in self.fields:
             self.fields['content'].required = False
         # Make topic required
@@ -35,19 +43,12 @@ class KnowledgeEntryForm(forms.ModelForm):
             raise forms.ValidationError('Please select a topic for this entry')
         return topic
 
-    def clean_slug(self):
-        slug = self.cleaned_data.get('slug')
-        title = self.cleaned_data.get('title')
-
-        if not slug and title:
-            base_slug = slugify(title)
-            slug = base_slug
-            counter = 1
-            while KnowledgeEntry.objects.filter(slug=slug).exclude(pk=self.instance.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
+    def clean_parent(self):
+        parent = self.cleaned_data.get('parent')
+        if parent and self.instance.pk and parent.is_descendant_of(self.instance):
+            raise forms.ValidationError('A page cannot be moved under itself or one of its sub-pages')
+        return parent
 
-        return slug
     class Meta:
         model = KnowledgeEntry
         fields = ['title', 'slug', 'topic', 'parent', 'order', 'entry_type', 'status', 'content', 'summary', 'source_url', 'tags', 'is_favorite']
@@ -0,0 +1,325 @@
+"""
+Bulk import of markdown folders and zip archives into the knowledge base.
+
+Folders become parent pages: ``index.md``/``README.md`` inside a folder
+supplies the folder page itself, otherwise a short page named after the
+folder is created. Every other ``.md`` file becomes a child of its folder.
+A leading YAML-style front-matter block sets ``title``, ``topic``,
+``tags``, ``status``, ``summary``, ``type``, ``order``, ``source_url`` and
+``favorite``; folder pages pass their topic down to the files below them.
+
+Files are read one at a time and inserted with ``bulk_create`` in batches,
+each in its own transaction. Only the folder -> entry map and the current
+batch are held in memory, so memory use does not grow with the archive.
+"""
+
+import json
+import os
+import zipfile
+
+from django.db import transaction
+
+from mywebsite.rendering import render_config_fingerprint, render_key, render_markdown
+from mywebsite.slugs import allocate_slug, base_slug
+from mywebsite.dashboard import invalidate_dashboard_stats
+from mywebsite.feeds import invalidate_feeds
+from .models import KnowledgeEntry, Topic, tree_path_segment
+from .sidebar import invalidate_sidebar
+from .stats import invalidate_public_topic_counts
+
+
+IMPORT_BATCH_SIZE = 200
+MAX_FILE_BYTES = 5 * 1024 * 1024
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+INDEX_NAMES = ('index.md', 'readme.md', '_index.md')
+# Metadata directories left by archivers and editors
+IGNORED_PARTS = ('__MACOSX',)
+
+
+def is_markdown(name):
+    return name.lower().endswith(MARKDOWN_EXTENSIONS)
+
+
+def is_index(name):
+    return name.lower() in INDEX_NAMES
+
+
+def _visible(parts):
+    return not any(part.startswith('.') or part in IGNORED_PARTS for part in parts)
+
+
+class DirectorySource:
+    """Markdown files below a directory on disk."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def paths(self):
+        """Relative paths as tuples of parts, in sorted order."""
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            relative = os.path.relpath(directory, self.root)
+            prefix = () if relative == os.curdir else tuple(relative.split(os.sep))
+            for filename in sorted(filenames):
+                parts = prefix + (filename,)
+                if is_markdown(filename) and _visible(parts):
+                    yield parts
+
+    def size(self, parts):
+        return os.path.getsize(os.path.join(self.root, *parts))
+
+    def read(self, parts):
+        with open(os.path.join(self.root, *parts), 'rb') as handle:
+            return handle.read()
+
+
+class ZipSource:
+    """Markdown members of a zip archive (a path or a seekable file).
+
+    Members are decompressed one at a time when read; the archive's
+    central directory is all that is kept in memory.
+    """
+
+    def __init__(self, file):
+        self.archive = zipfile.ZipFile(file)
+        self.members = {}
+        for info in self.archive.infolist():
+            parts = tuple(part for part in info.filename.split('/') if part)
+            if not info.is_dir() and parts and is_markdown(parts[-1]) and _visible(parts):
+                self.members[parts] = info
+
+    def paths(self):
+        return iter(sorted(self.members))
+
+    def size(self, parts):
+        # From the central directory; reads stop at this size, so a zip
+        # bomb cannot inflate past the limit checked against it
+        return self.members[parts].file_size
+
+    def read(self, parts):
+        with self.archive.open(self.members[parts]) as member:
+            return member.read()
+
+    def close(self):
+        self.archive.close()
+
+
+def parse_front_matter(text):
+    """Split ``text`` into ``(metadata, body)``.
+
+    Supports the subset of YAML front matter that docs tools write:
+    ``key: value`` pairs, quoted strings, ``[a, b]`` lists and ``- item``
+    list lines. Anything else is ignored rather than rejected.
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines or lines[0].strip() != '---':
+        return {}, text
+    for end in range(1, len(lines)):
+        if lines[end].strip() in ('---', '...'):
+            break
+    else:
+        return {}, text
+
+    metadata = {}
+    key = None
+    for line in lines[1:end]:
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped.startswith('- ') and key is not None:
+            if not isinstance(metadata.get(key), list):
+                metadata[key] = []
+            metadata[key].append(_unquote(stripped[2:]))
+            continue
+        name, sep, value = stripped.partition(':')
+        if not sep:
+            continue
+        key = name.strip().lower()
+        value = value.strip()
+        if value.startswith('[') and value.endswith(']'):
+            metadata[key] = [_unquote(item) for item in value[1:-1].split(',') if item.strip()]
+        else:
+            metadata[key] = _unquote(value)
+    return metadata, ''.join(lines[end + 1:]).lstrip('\r\n')
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        if value[0] == '"':
+            # Double-quoted YAML scalars use JSON's escapes (as the exporter writes them)
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+        return value[1:-1]
+    return value
+
+
+def _first_heading(body):
+    for line in body.splitlines():
+        if line.startswith('# '):
+            return line[2:].strip()
+    return ''
+
+
+def _title_from_name(name):
+    stem = name.rsplit('.', 1)[0] if is_markdown(name) else name
+    return stem.replace('-', ' ').replace('_', ' ').strip() or name
+
+
+def _as_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class MarkdownImporter:
+    """Import a ``DirectorySource``/``ZipSource`` for one user.
+
+    ``parent`` puts the imported tree below an existing entry; ``topic``
+    and ``status`` are the defaults for files that do not set their own.
+    ``run()`` returns ``{'created', 'folders', 'skipped'}`` where
+    ``skipped`` lists ``(path, reason)`` pairs.
+    """
+
+    def __init__(self, user, parent=None, topic=None, status='private', batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.status = status
+        self.batch_size = batch_size
+        self.slug_length = KnowledgeEntry._meta.get_field('slug').max_length
+        self.fingerprint = render_config_fingerprint()
+        # folder parts -> (pk, tree_path, topic_id); () is the import root
+        self.folders = {(): (
+            parent.pk if parent else None,
+            parent.tree_path if parent else '',
+            topic.pk if topic else (parent.topic_id if parent else None),
+        )}
+        self.positions = {}
+        self.topics = {}
+        self.batch = []
+        self.reserved = set()
+        self.created = 0
+        self.folder_count = 0
+        self.skipped = []
+
+    def run(self, source):
+        folders = set()
+        indexes = {}
+        for parts in source.paths():
+            folders.update(parts[:depth] for depth in range(1, len(parts)))
+            if len(parts) > 1 and is_index(parts[-1]):
+                indexes.setdefault(parts[:-1], parts)
+
+        # Folder pages go in level by level, so every parent has its pk
+        for level in sorted({len(folder) for folder in folders}):
+            for folder in sorted(folder for folder in folders if len(folder) == level):
+                index = indexes.get(folder)
+                text = self._read(source, index) if index else ''
+                self._add(folder, text or '', is_folder=True)
+            self._flush()
+
+        for parts in source.paths():
+            if indexes.get(parts[:-1]) == parts:
+                continue
+            text = self._read(source, parts)
+            if text is not None:
+                self._add(parts, text)
+        self._flush()
+
+        if self.created:
+            # bulk_create sends no post_save, so the signal handlers never ran
+            invalidate_sidebar(self.user.pk)
+            invalidate_public_topic_counts()
+            invalidate_dashboard_stats()
+            invalidate_feeds('knowledge')
+        return {'created': self.created, 'folders': self.folder_count, 'skipped': self.skipped}
+
+    def _read(self, source, parts):
+        if source.size(parts) > MAX_FILE_BYTES:
+            self.skipped.append(('/'.join(parts), 'larger than %d MB' % (MAX_FILE_BYTES // (1024 * 1024))))
+            return None
+        try:
+            return source.read(parts).decode('utf-8-sig')
+        except UnicodeDecodeError:
+            self.skipped.append(('/'.join(parts), 'not UTF-8'))
+            return None
+
+    def _topic_id(self, name):
+        if name not in self.topics:
+            slug = base_slug(name, Topic._meta.get_field('slug').max_length, fallback='topic')
+            topic = Topic.objects.filter(name__iexact=name).first()
+            if topic is None:
+                topic, _ = Topic.objects.get_or_create(slug=slug, defaults={'name': name[:100]})
+            self.topics[name] = topic.pk
+        return self.topics[name]
+
+    def _slug(self, title):
+        base = base_slug(title, self.slug_length, fallback='entry')
+        queryset = KnowledgeEntry.objects.all()
+        slug = allocate_slug(queryset, base, max_length=self.slug_length)
+        if slug in self.reserved:
+            # Taken earlier in this batch; insert the batch and ask again
+            self._flush()
+            slug = allocate_slug(queryset, base, max_length=self.slug_length)
+        self.reserved.add(slug)
+        return slug
+
+    def _add(self, parts, text, is_folder=False):
+        meta, body = parse_front_matter(text)
+        folder = parts[:-1]
+        parent_id, parent_path, inherited_topic = self.folders[folder]
+
+        title = str(meta.get('title') or _first_heading(body) or _title_from_name(parts[-1]))
+        title = title[:KnowledgeEntry._meta.get_field('title').max_length]
+        topic_id = self._topic_id(str(meta['topic'])) if meta.get('topic') else inherited_topic
+        tags = meta.get('tags', '')
+        if isinstance(tags, list):
+            tags = ','.join(str(tag).strip() for tag in tags)
+
+        status = str(meta.get('status', '')).lower()
+        entry_type = str(meta.get('type', meta.get('entry_type', ''))).lower()
+        position = self.positions.get(folder, 0) + 1
+        self.positions[folder] = position
+        try:
+            order = int(meta['order'])
+        except (KeyError, TypeError, ValueError):
+            order = position
+
+        entry = KnowledgeEntry(
+            user=self.user,
+            title=title,
+            slug=self._slug(title),
+            topic_id=topic_id,
+            parent_id=parent_id,
+            order=order,
+            entry_type=entry_type if entry_type in dict(KnowledgeEntry.TYPE_CHOICES) else 'note',
+            status=status if status in dict(KnowledgeEntry.STATUS_CHOICES) else self.status,
+            content=body,
+            summary=str(meta.get('summary', ''))[:500],
+            source_url=str(meta.get('source_url', ''))[:200],
+            tags=tags[:200],
+            is_favorite=_as_bool(meta.get('favorite', False)),
+        )
+        entry.rendered_html, entry.rendered_toc, entry.rendered_headings = render_markdown(body)
+        entry.rendered_key = render_key(body, self.fingerprint)
+        self.batch.append((entry, parent_path, parts if is_folder else None))
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.batch:
+            return
+        with transaction.atomic():
+            entries = KnowledgeEntry.objects.bulk_create([entry for entry, _path, _folder in self.batch])
+            # bulk_create skips save(), which is what maintains the paths
+            for entry, (_entry, parent_path, _folder) in zip(entries, self.batch):
+                entry.tree_path = parent_path + tree_path_segment(entry.pk)
+                entry.depth = entry.tree_path.count('/') - 1
+            KnowledgeEntry.objects.bulk_update(entries, ['tree_path', 'depth'])
+
+        for entry, _path, folder in self.batch:
+            if folder is not None:
+                self.folders[folder] = (entry.pk, entry.tree_path, entry.topic_id)
+                self.folder_count += 1
+        self.created += len(self.batch)
+        self.batch = []
+        self.reserved = set()
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from mywebsite.benchmark import benchmark_client, benchmark_targets, benchmark_url
+from mywebsite.seeding import DEFAULT_PREFIX, scale_users
+
+
+class Command(BaseCommand):
+    help = "Time every named URL and report p50/p95 latency, query counts and response size"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            type=str,
+            help="User to log in as (default: first scale-seeded user, then first superuser)",
+        )
+        parser.add_argument("--anonymous", action="store_true", help="Request every URL without logging in")
+        parser.add_argument("--repeat", type=int, default=20, help="Measured requests per URL (default: 20)")
+        parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per URL (default: 2)")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request")
+        parser.add_argument("--match", type=str, help="Only URLs whose name contains this text")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user = None
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+        if not user:
+            user = (
+                scale_users(DEFAULT_PREFIX).order_by("pk").first()
+                or User.objects.filter(is_superuser=True).first()
+                or User.objects.first()
+            )
+        if not user:
+            self.stdout.write(self.style.ERROR("No users found. Run seed_knowledge --scale first."))
+            return
+
+        client = benchmark_client(None if options["anonymous"] else user)
+        targets, skipped = benchmark_targets(user, match=options["match"])
+        self.stdout.write(
+            f"{len(targets)} URLs, {options['repeat']} requests each, "
+            f"as {'anonymous' if options['anonymous'] else user.username}"
+            f"{', cold cache' if options['cold'] else ''}\n"
+        )
+
+        header = f"{'name':<36} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'bytes':>10}  url"
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        for name, url in targets:
+            result = benchmark_url(
+                client, url, repeat=options["repeat"], warmup=options["warmup"], cold=options["cold"],
+            )
+            line = (
+                f"{name:<36} {result['status']:>6} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                f"{result['queries']:>8} {result['bytes']:>10}  {url}"
+            )
+            self.stdout.write(line if result["status"] < 400 else self.style.WARNING(line))
+
+        if skipped:
+            self.stdout.write(f"\nSkipped (no sample object): {', '.join(skipped)}")
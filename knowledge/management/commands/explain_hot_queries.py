@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from mywebsite.query_plans import explain_hot_queries
+
+
+class Command(BaseCommand):
+    help = "Print the query plan of each hot query (see mywebsite/query_plans.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sql", action="store_true", help="Also print the SQL")
+
+    def handle(self, *args, **options):
+        for label, sql, plan in explain_hot_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            if options["sql"]:
+                self.stdout.write(sql)
+            self.stdout.write(plan)
+            self.stdout.write("")
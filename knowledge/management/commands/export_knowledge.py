@@ -0,0 +1,57 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from knowledge.exporter import EXPORT_CHUNK_SIZE, iter_markdown_zip, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = "Export a user's topics, entries and resources as NDJSON or a markdown zip"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write, or - for standard output")
+        parser.add_argument(
+            "--username",
+            type=str,
+            help="User to export (default: first superuser or first user)",
+        )
+        parser.add_argument(
+            "--as",
+            dest="archive",
+            choices=["ndjson", "zip"],
+            default="ndjson",
+            help="Output format (default: ndjson)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f"Rows fetched per database round trip (default: {EXPORT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"No user named '{options['username']}'.")
+        else:
+            user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if not user:
+            raise CommandError("No users found. Create a user first.")
+
+        stream = iter_markdown_zip if options["archive"] == "zip" else iter_ndjson
+        chunks = stream(user, chunk_size=options["chunk_size"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        size = 0
+        with open(options["output"], "wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                size += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported {user.username} to {options['output']} ({size} bytes)"))
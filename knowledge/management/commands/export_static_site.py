@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mywebsite.static_site import StaticSiteBuilder
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the public portal (home, blog, note-taking, list-100, about, contact) "
+        "into static files with hashed assets; later runs only re-render what changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory to write the site to")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-render every page instead of only the pages affected by changes",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host name the pages are requested with (default: localhost)",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        builder = StaticSiteBuilder(options["output"], incremental=not options["full"], host=options["host"])
+        result = builder.build()
+        elapsed = time.perf_counter() - start
+
+        for url, status in result["failed"]:
+            self.stderr.write(self.style.WARNING(f"{url}: HTTP {status}, previous file kept"))
+        self.stdout.write(
+            f"{result['rendered']} rendered, {result['unchanged']} unchanged, "
+            f"{result['removed']} removed in {elapsed:.1f}s -> {builder.output}"
+        )
+        if result["failed"]:
+            raise CommandError(f"{len(result['failed'])} page(s) failed to render")
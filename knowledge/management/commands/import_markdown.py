@@ -0,0 +1,79 @@
+import os
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from knowledge.importer import IMPORT_BATCH_SIZE, DirectorySource, MarkdownImporter, ZipSource
+from knowledge.models import KnowledgeEntry, Topic
+
+
+class Command(BaseCommand):
+    help = "Import a folder or zip archive of markdown files as knowledge entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Directory or .zip archive to import")
+        parser.add_argument(
+            "--username",
+            type=str,
+            help="Owner of the imported entries (default: first superuser or first user)",
+        )
+        parser.add_argument("--parent", type=str, help="Slug of an existing entry to import below")
+        parser.add_argument("--topic", type=str, help="Topic name for files without front-matter topic")
+        parser.add_argument(
+            "--status",
+            choices=[choice for choice, _label in KnowledgeEntry.STATUS_CHOICES],
+            default="private",
+            help="Status for files without front-matter status (default: private)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f"Entries per insert transaction (default: {IMPORT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"No user named '{options['username']}'.")
+        else:
+            user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if not user:
+            raise CommandError("No users found. Create a user first.")
+
+        parent = None
+        if options["parent"]:
+            parent = KnowledgeEntry.objects.filter(user=user, slug=options["parent"]).first()
+            if parent is None:
+                raise CommandError(f"No entry '{options['parent']}' for user {user.username}.")
+        topic = None
+        if options["topic"]:
+            topic = Topic.objects.filter(name__iexact=options["topic"]).first()
+            if topic is None:
+                raise CommandError(f"No topic named '{options['topic']}'.")
+
+        path = options["path"]
+        if os.path.isdir(path):
+            source = DirectorySource(path)
+        elif zipfile.is_zipfile(path):
+            source = ZipSource(path)
+        else:
+            raise CommandError(f"{path} is neither a directory nor a zip archive.")
+
+        importer = MarkdownImporter(
+            user, parent=parent, topic=topic, status=options["status"], batch_size=options["batch_size"],
+        )
+        try:
+            result = importer.run(source)
+        finally:
+            if isinstance(source, ZipSource):
+                source.close()
+
+        for skipped_path, reason in result["skipped"]:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped_path}: {reason}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} entries ({result['folders']} folder pages) for {user.username}"
+        ))
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mywebsite.rerender import RERENDER_CHUNK_SIZE, rendered_models, rerender_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render every stale stored markdown rendering (blog posts and knowledge entries) "
+        "across a process pool; safe to interrupt and run again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes (default: number of CPUs; 1 renders in this process)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RERENDER_CHUNK_SIZE,
+            help=f"Documents per worker task and per bulk_update (default: {RERENDER_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            metavar="LABEL",
+            help="Only this model, e.g. blog.Post (repeatable; default: all rendered models)",
+        )
+
+    def handle(self, *args, **options):
+        models = rendered_models()
+        if options["models"]:
+            labels = {label.lower() for label in options["models"]}
+            models = [model for model in models if model._meta.label_lower in labels]
+            if len(models) != len(labels):
+                known = ", ".join(model._meta.label for model in rendered_models())
+                raise CommandError(f"Unknown model; choose from: {known}")
+        if options["chunk_size"] < 1 or (options["workers"] is not None and options["workers"] < 1):
+            raise CommandError("--workers and --chunk-size must be at least 1")
+
+        start = time.perf_counter()
+
+        def progress(model, scanned, total, rendered):
+            elapsed = time.perf_counter() - start
+            percent = scanned * 100 / total if total else 100
+            self.stdout.write(
+                f"{model._meta.label}: scanned {scanned}/{total} ({percent:.0f}%), "
+                f"re-rendered {rendered}, {elapsed:.1f}s"
+            )
+
+        results = rerender_all(
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            models=models,
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{label}: {count}" for label, count in results.items())
+        self.stdout.write(self.style.SUCCESS(f"Re-rendered {sum(results.values())} documents in {elapsed:.1f}s ({summary})"))
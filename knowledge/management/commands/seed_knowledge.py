@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from knowledge.models import Topic, KnowledgeEntry, Resource
+from mywebsite.seeding import DEFAULT_PREFIX, clear_scale, scale_users, seed_scale
 
 
 SAMPLE_ENTRIES = [
@@ -71,8 +72,21 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear existing topics/entries/resources for that user before seeding",
         )
+        scale = parser.add_argument_group("scale mode (bulk data for performance work)")
+        scale.add_argument("--scale", action="store_true", help="Generate a large data set instead of the samples")
+        scale.add_argument("--users", type=int, default=10, help="Number of users to create (default: 10)")
+        scale.add_argument("--entries", type=int, default=200, help="Knowledge entries per user (default: 200)")
+        scale.add_argument("--depth", type=int, default=5, help="Levels below each root entry (default: 5)")
+        scale.add_argument("--posts", type=int, default=2000, help="Blog posts in total (default: 2000)")
+        scale.add_argument("--tasks", type=int, default=300, help="Tasks per user (default: 300)")
+        scale.add_argument("--sessions", type=int, default=300, help="Study sessions per user (default: 300)")
+        scale.add_argument("--prefix", default=DEFAULT_PREFIX, help=f"Username/slug prefix of generated rows (default: {DEFAULT_PREFIX})")
+        scale.add_argument("--seed", type=int, help="Random seed for a reproducible data set")
 
     def handle(self, *args, **options):
+        if options["scale"]:
+            return self.handle_scale(options)
+
         username = options.get("username")
         clear = options.get("clear")
         User = get_user_model()
@@ -139,3 +153,27 @@ class Command(BaseCommand):
             )
 
         self.stdout.write(self.style.SUCCESS(f"Seeded sample knowledge data for user: {user.username}"))
+
+    def handle_scale(self, options):
+        prefix = options["prefix"]
+        if options["clear"]:
+            deleted = clear_scale(prefix)
+            self.stdout.write(f"Removed {deleted} rows of previous '{prefix}' data")
+        elif scale_users(prefix).exists():
+            self.stdout.write(self.style.ERROR(
+                f"Scale data with prefix '{prefix}' already exists. Use --clear or another --prefix."
+            ))
+            return
+
+        counts = seed_scale(
+            users=options["users"],
+            entries=options["entries"],
+            depth=options["depth"],
+            posts=options["posts"],
+            tasks=options["tasks"],
+            sessions=options["sessions"],
+            prefix=prefix,
+            seed=options["seed"],
+        )
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded scale data: {summary}"))
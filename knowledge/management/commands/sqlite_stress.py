@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from mywebsite.benchmark import percentile
+from mywebsite.sqlite import pragma_statements
+
+
+SCHEMA = [
+    "CREATE TABLE counters (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)",
+    "CREATE TABLE events (id INTEGER PRIMARY KEY, counter_id INTEGER NOT NULL, payload TEXT NOT NULL)",
+]
+
+
+def _connect(path, config):
+    # Autocommit at the driver level; transactions are begun explicitly
+    conn = sqlite3.connect(path, timeout=config["timeout"], isolation_level=None)
+    for statement in config["pragmas"]:
+        conn.execute(statement).fetchall()
+    return conn
+
+
+def _setup(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.executemany("INSERT INTO counters (id, value) VALUES (?, 0)", [(pk,) for pk in range(1, 101)])
+    conn.close()
+
+
+def _writer(path, config, seconds, seed):
+    """Read-then-write transactions, the shape of a form save."""
+    conn = _connect(path, config)
+    commits = errors = 0
+    latencies = []
+    counter = seed
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        counter = counter % 100 + 1
+        start = time.perf_counter()
+        try:
+            conn.execute(config["begin"])
+            conn.execute("SELECT value FROM counters WHERE id = ?", (counter,)).fetchone()
+            conn.execute("INSERT INTO events (counter_id, payload) VALUES (?, ?)", (counter, "x" * 500))
+            conn.execute("UPDATE counters SET value = value + 1 WHERE id = ?", (counter,))
+            conn.execute("COMMIT")
+            commits += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    return {"role": "writer", "ops": commits, "errors": errors, "latencies": latencies}
+
+
+def _reader(path, config, seconds, seed):
+    """Short read queries, the shape of a page view."""
+    conn = _connect(path, config)
+    reads = errors = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.execute("SELECT COUNT(*), MAX(id) FROM events WHERE counter_id = ?", (seed % 100 + 1,)).fetchone()
+            conn.execute("SELECT SUM(value) FROM counters").fetchone()
+            reads += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    return {"role": "reader", "ops": reads, "errors": errors, "latencies": latencies}
+
+
+def _run_worker(args):
+    role, path, config, seconds, seed = args
+    return (_writer if role == "writer" else _reader)(path, config, seconds, seed)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a scratch SQLite database from several processes, with Django's default "
+        "connection setup and with SQLITE_PRAGMAS + BEGIN IMMEDIATE, and compare"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Writer processes (default: 8)")
+        parser.add_argument("--readers", type=int, default=4, help="Reader processes (default: 4)")
+        parser.add_argument("--seconds", type=float, default=5, help="Duration of each run (default: 5)")
+
+    def configurations(self):
+        options = settings.DATABASES["default"].get("OPTIONS", {})
+        mode = options.get("transaction_mode")
+        return [
+            # What the bare sqlite3 backend does: rollback journal, deferred BEGIN
+            ("default", {"pragmas": [], "timeout": 5.0, "begin": "BEGIN"}),
+            ("tuned", {
+                "pragmas": pragma_statements(getattr(settings, "SQLITE_PRAGMAS", {})),
+                "timeout": options.get("timeout", 5.0),
+                "begin": f"BEGIN {mode}" if mode else "BEGIN",
+            }),
+        ]
+
+    def handle(self, *args, **options):
+        header = (
+            f"{'setup':<8} {'writes/s':>9} {'write errors':>13} {'write p95 ms':>13} "
+            f"{'reads/s':>9} {'read errors':>12} {'read p95 ms':>12}"
+        )
+        self.stdout.write(
+            f"{options['writers']} writers, {options['readers']} readers, {options['seconds']}s per setup\n"
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        for name, config in self.configurations():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "stress.sqlite3")
+                _setup(path)
+                jobs = (
+                    [("writer", path, config, options["seconds"], seed) for seed in range(options["writers"])]
+                    + [("reader", path, config, options["seconds"], seed) for seed in range(options["readers"])]
+                )
+                with multiprocessing.Pool(len(jobs)) as pool:
+                    results = pool.map(_run_worker, jobs)
+            self.stdout.write(self.format_row(name, results, options["seconds"]))
+
+    def format_row(self, name, results, seconds):
+        columns = []
+        for role in ("writer", "reader"):
+            role_results = [result for result in results if result["role"] == role]
+            latencies = [value for result in role_results for value in result["latencies"]]
+            ops = sum(result["ops"] for result in role_results)
+            errors = sum(result["errors"] for result in role_results)
+            p95 = percentile(latencies, 95) if latencies else 0.0
+            columns.append((ops / seconds, errors, p95))
+        (writes, write_errors, write_p95), (reads, read_errors, read_p95) = columns
+        return (
+            f"{name:<8} {writes:>9.0f} {write_errors:>13} {write_p95:>13.1f} "
+            f"{reads:>9.0f} {read_errors:>12} {read_p95:>12.1f}"
+        )
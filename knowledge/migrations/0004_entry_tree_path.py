@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def populate_tree_paths(apps, schema_editor):
+    KnowledgeEntry = apps.get_model('knowledge', 'KnowledgeEntry')
+    parents = dict(KnowledgeEntry.objects.values_list('id', 'parent_id'))
+    children = {}
+    for pk, parent_id in parents.items():
+        children.setdefault(parent_id if parent_id in parents else None, []).append(pk)
+
+    updated = []
+    stack = [(pk, '') for pk in children.get(None, [])]
+    while stack:
+        pk, prefix = stack.pop()
+        path = f"{prefix}{pk:010d}/"
+        updated.append(KnowledgeEntry(id=pk, tree_path=path, depth=path.count('/') - 1))
+        stack.extend((child, path) for child in children.get(pk, []))
+    KnowledgeEntry.objects.bulk_update(updated, ['tree_path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0003_alter_knowledgeentry_options_knowledgeentry_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='knowledgeentry',
+            name='tree_path',
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default='',
+                editable=False,
+                help_text='Materialized path of ancestor ids, maintained on save',
+                max_length=1000,
+            ),
+        ),
+        migrations.AddField(
+            model_name='knowledgeentry',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_tree_paths, migrations.RunPython.noop),
+    ]
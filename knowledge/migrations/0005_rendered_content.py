@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0004_entry_tree_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='knowledgeentry',
+            name='rendered_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='knowledgeentry',
+            name='rendered_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='knowledgeentry',
+            name='rendered_toc',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
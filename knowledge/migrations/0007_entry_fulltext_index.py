@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def create_fts_index(apps, schema_editor):
+    from knowledge.search import install_fts_index
+    install_fts_index(schema_editor.connection)
+
+
+def remove_fts_index(apps, schema_editor):
+    from knowledge.search import drop_fts_index
+    drop_fts_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0006_rendered_headings'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, remove_fts_index),
+    ]
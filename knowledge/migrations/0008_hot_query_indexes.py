@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0007_entry_fulltext_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='knowledgeentry',
+            index=models.Index(fields=['user', 'parent', 'order', 'title'], name='entry_user_parent_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='knowledgeentry',
+            index=models.Index(condition=models.Q(('parent__isnull', True)), fields=['user', 'topic', 'order', 'title'], name='entry_root_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='knowledgeentry',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='entry_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='knowledgeentry',
+            index=models.Index(condition=models.Q(('status', 'public')), fields=['updated_at'], name='entry_public_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='knowledgeentry',
+            index=models.Index(condition=models.Q(('status', 'public')), fields=['topic', 'updated_at'], name='entry_public_topic_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:01
+
+import django.db.models.deletion
+import knowledge.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KnowledgeEntryIndex',
+            fields=[
+                ('entry', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='knowledge.knowledgeentry')),
+                ('document', knowledge.models.FullTextMatchField(db_column='knowledge_entry_fts')),
+            ],
+            options={
+                'db_table': 'knowledge_entry_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('knowledge', '0009_entry_fulltext_model'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='resource_user_updated_idx'),
+        ),
+    ]
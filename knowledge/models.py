@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, StrIndex, Substr
 from django.contrib.auth.models import User
+from mywebsite.rendering import RenderedMarkdownModel
 
 class Topic(models.Model):
     name = models.CharField(max_length=100)
@@ -11,7 +14,137 @@ class Topic(models.Model):
     def __str__(self):
         return self.name
 
-class KnowledgeEntry(models.Model):
+TREE_SEGMENT_WIDTH = 10
+
+def tree_path_segment(pk):
+    """Return the fixed-width materialized path segment for a primary key."""
+    return f"{pk:0{TREE_SEGMENT_WIDTH}d}/"
+
+def subtree_q(path):
+    """Match ``path`` and every path below it.
+
+    Uses a range instead of ``startswith`` so SQLite can answer it from the
+    ``tree_path`` index (its LIKE operator is case-insensitive and skips it).
+    """
+    return Q(tree_path__gte=path, tree_path__lt=path[:-1] + '0')
+
+def link_entry_tree(nodes):
+    """Link already-loaded entries into a forest and return its roots.
+
+    Every node gets a ``tree_children`` list, kept in input order, so
+    templates can recurse without issuing a query per level. Nodes whose
+    parent is not among ``nodes`` are returned as roots.
+    """
+    by_id = {node.id: node for node in nodes}
+    roots = []
+    for node in nodes:
+        node.tree_children = []
+    for node in nodes:
+        parent = by_id.get(node.parent_id)
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.tree_children.append(node)
+    return roots
+
+class KnowledgeEntryQuerySet(models.QuerySet):
+    def subtree(self, entry, include_self=True):
+        """Entries at or below ``entry`` in the hierarchy."""
+        queryset = self.filter(subtree_q(entry.tree_path))
+        if not include_self:
+            queryset = queryset.exclude(pk=entry.pk)
+        return queryset
+
+    def as_tree(self):
+        """Evaluate the queryset once and link the rows into a forest."""
+        return link_entry_tree(list(self))
+
+    def rebuild_tree(self):
+        """Recompute ``tree_path``/``depth`` for the rows in this queryset.
+
+        Needed after writes that bypass ``save()``, such as ``bulk_create``
+        or ``reorder()``. Paths are derived within the queryset; a row whose
+        parent lies outside it hangs off that parent's stored path, so only
+        the rows being fixed are loaded, not the whole table.
+        """
+        rows = self.select_related(None).only('id', 'parent_id', 'tree_path', 'depth')
+        rows = {entry.id: entry for entry in rows}
+        parents = {pk: entry.parent_id for pk, entry in rows.items()}
+        outside = {parent for parent in parents.values() if parent is not None and parent not in rows}
+        paths = dict(self.model.objects.filter(pk__in=outside).values_list('id', 'tree_path'))
+
+        def path_for(pk):
+            chain = []
+            while pk in parents and pk not in paths and pk not in chain:
+                chain.append(pk)
+                pk = parents[pk]
+            # A cycle left behind by older data is broken at the repeated node.
+            prefix = paths.get(pk, '')
+            for node in reversed(chain):
+                prefix += tree_path_segment(node)
+                paths[node] = prefix
+            return paths[chain[0]] if chain else paths[pk]
+
+        changed = []
+        for entry in rows.values():
+            path = path_for(entry.id)
+            depth = path.count('/') - 1
+            if entry.tree_path != path or entry.depth != depth:
+                entry.tree_path = path
+                entry.depth = depth
+                changed.append(entry)
+        self.model.objects.bulk_update(changed, ['tree_path', 'depth'], batch_size=500)
+        return len(changed)
+
+    def reorder(self, changes):
+        """Apply ``{'id', 'order', 'parent'}`` changes in one transaction.
+
+        Every id and parent must be in this queryset; ``parent`` may be
+        omitted to keep the current one. Rows are written with a single
+        ``bulk_update`` (no re-rendering, ``updated_at`` untouched) and the
+        paths of moved subtrees are rebuilt afterwards. Raises ``ValueError``
+        for unknown entries or a parent cycle; returns ``(updated, moved)``.
+        """
+        with transaction.atomic():
+            parents = dict(self.values_list('id', 'parent_id'))
+            new_parents = {}
+            for change in changes:
+                pk = change['id']
+                parent = change.get('parent', parents.get(pk))
+                if pk not in parents:
+                    raise ValueError(f"Unknown entry {pk}.")
+                if parent is not None and parent not in parents:
+                    raise ValueError(f"Unknown parent {parent} for entry {pk}.")
+                new_parents[pk] = parent
+
+            final_parents = {**parents, **new_parents}
+            moved = {pk for pk, parent in new_parents.items() if parent != parents[pk]}
+            for pk in moved:
+                seen = {pk}
+                node = final_parents[pk]
+                while node is not None:
+                    if node in seen:
+                        raise ValueError("An entry cannot be moved under itself or one of its descendants.")
+                    seen.add(node)
+                    node = final_parents.get(node)
+
+            orders = {change['id']: change['order'] for change in changes}
+            changed = []
+            moved_paths = Q(pk__in=moved)
+            rows = self.select_related(None).filter(pk__in=new_parents).only('id', 'parent_id', 'order', 'tree_path')
+            for entry in rows:
+                if entry.pk in moved and entry.tree_path:
+                    moved_paths |= subtree_q(entry.tree_path)
+                if entry.parent_id != new_parents[entry.pk] or entry.order != orders[entry.pk]:
+                    entry.parent_id = new_parents[entry.pk]
+                    entry.order = orders[entry.pk]
+                    changed.append(entry)
+            self.model.objects.bulk_update(changed, ['parent', 'order'], batch_size=500)
+            if moved:
+                self.model.objects.filter(moved_paths).rebuild_tree()
+        return len(changed), len(moved)
+
+class KnowledgeEntry(RenderedMarkdownModel):
     TYPE_CHOICES = [
         ('note', 'Note'),
         ('research', 'Research'),
@@ -44,16 +177,148 @@ class KnowledgeEntry(models.Model):
     source_url = models.URLField(blank=True)
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
     is_favorite = models.BooleanField(default=False)
+    tree_path = models.CharField(
+        max_length=1000,
+        blank=True,
+        default='',
+        editable=False,
+        db_index=True,
+        help_text="Materialized path of ancestor ids, maintained on save",
+    )
+    depth = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = KnowledgeEntryQuerySet.as_manager()
+
     class Meta:
         ordering = ['order', 'title']
         verbose_name_plural = "Knowledge Entries"
+        indexes = [
+            # Per-user tree: children of a page in display order
+            models.Index(fields=['user', 'parent', 'order', 'title'], name='entry_user_parent_order_idx'),
+            # Root pages of a topic (detail page siblings)
+            models.Index(
+                fields=['user', 'topic', 'order', 'title'],
+                condition=Q(parent__isnull=True),
+                name='entry_root_order_idx',
+            ),
+            # API lists and keyset pages: newest first per user
+            models.Index(fields=['user', 'updated_at', 'id'], name='entry_user_updated_idx'),
+            # Public note-taking page, all topics and per topic
+            models.Index(fields=['updated_at'], condition=Q(status='public'), name='entry_public_updated_idx'),
+            models.Index(
+                fields=['topic', 'updated_at'],
+                condition=Q(status='public'),
+                name='entry_public_topic_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def is_descendant_of(self, other):
+        """True if ``other`` is this entry or one of its ancestors."""
+        return bool(other.tree_path) and self.tree_path.startswith(other.tree_path)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' not in update_fields:
+            return super().save(*args, **kwargs)
+
+        entries = KnowledgeEntry.objects
+        stored_path = ''
+        if self.pk:
+            stored_path = entries.filter(pk=self.pk).values_list('tree_path', flat=True).first() or ''
+        parent_path = ''
+        if self.parent_id:
+            parent_path = entries.filter(pk=self.parent_id).values_list('tree_path', flat=True).first() or ''
+            if stored_path and parent_path.startswith(stored_path):
+                raise ValueError("An entry cannot be moved under itself or one of its descendants.")
+
+        super().save(*args, **kwargs)
+
+        self.tree_path = parent_path + tree_path_segment(self.pk)
+        self.depth = self.tree_path.count('/') - 1
+        if self.tree_path != stored_path:
+            entries.filter(pk=self.pk).update(tree_path=self.tree_path, depth=self.depth)
+            if stored_path:
+                move_subtree(stored_path, self.tree_path, exclude_pk=self.pk)
+
+def move_subtree(old_path, new_path, exclude_pk=None):
+    """Rewrite the paths below ``old_path`` so they hang off ``new_path``."""
+    delta = (new_path.count('/') - 1) - (old_path.count('/') - 1)
+    descendants = KnowledgeEntry.objects.filter(subtree_q(old_path))
+    if exclude_pk is not None:
+        descendants = descendants.exclude(pk=exclude_pk)
+    descendants.update(
+        tree_path=Concat(Value(new_path), Substr('tree_path', len(old_path) + 1)),
+        depth=F('depth') + delta,
+    )
+
+def detach_subtree(pk, tree_path=''):
+    """Re-root the entries that sat below a deleted entry.
+
+    ``parent`` is ``SET_NULL``, so the children become roots; their paths
+    lose every segment up to and including the deleted one. ``tree_path`` is
+    the deleted row's path as it was loaded. When an ancestor was removed
+    earlier in the same cascade the children's paths have already lost that
+    ancestor's prefix, so every suffix of the path is tried as well; each is
+    an index range. Without a path the segment is matched anywhere, which
+    scans the table.
+    """
+    segment = tree_path_segment(pk)
+    if tree_path.endswith(segment):
+        below = Q()
+        for start in range(0, len(tree_path), len(segment)):
+            below |= subtree_q(tree_path[start:])
+        entries = KnowledgeEntry.objects.filter(below)
+    else:
+        entries = KnowledgeEntry.objects.filter(tree_path__contains=segment)
+    cut = StrIndex('tree_path', Value(segment)) + len(segment)
+    entries.update(
+        tree_path=Substr('tree_path', cut),
+        depth=F('depth') - (cut - 1) / len(segment),
+    )
+
+class FullTextMatchField(models.TextField):
+    """The hidden column of an FTS5 table, named after the table itself.
+
+    Filtering it with ``__match`` runs ``MATCH``; it is also the first
+    argument of the FTS5 auxiliary functions (``bm25``, ``snippet``).
+    """
+
+
+@FullTextMatchField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class KnowledgeEntryIndex(models.Model):
+    """Read-only view of the FTS5 index (see ``knowledge.search``).
+
+    Unmanaged: the virtual table and its triggers are installed by
+    ``install_fts_index``. Joining it from an entry reads the match, its
+    rank and snippet in one ``MATCH``.
+    """
+    entry = models.OneToOneField(
+        KnowledgeEntry,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    document = FullTextMatchField(db_column='knowledge_entry_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'knowledge_entry_fts'
+
 class Resource(models.Model):
     RESOURCE_TYPE_CHOICES = [
         ('book', 'Book'),
@@ -83,6 +348,10 @@ class Resource(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # API keyset pages
+            models.Index(fields=['user', 'updated_at', 'id'], name='resource_user_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,182 @@
+"""
+Full-text search over knowledge entries.
+
+On SQLite the entries are indexed in an FTS5 table (``knowledge_entry_fts``)
+that triggers keep in sync with ``knowledge_knowledgeentry``, so bulk writes
+are indexed too. Queries join it through the unmanaged
+``KnowledgeEntryIndex`` model, so one ``MATCH`` selects the rows, ranks them
+with BM25 and cuts a highlighted snippet. Other database backends fall back
+to ``icontains`` filtering.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import CharField, F, FloatField, Func, Q, Value
+from django.utils.html import escape
+from rest_framework import filters
+
+
+FTS_TABLE = 'knowledge_entry_fts'
+
+# Column weights for bm25(), in index column order: title, summary, tags, content
+BM25_WEIGHTS = (10.0, 4.0, 6.0, 1.0)
+SNIPPET_TOKENS = 24
+
+# Control characters mark highlights inside the raw snippet; the text is
+# HTML-escaped before they are turned into <mark> tags.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+FTS_TRIGGERS = {
+    'knowledge_entry_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS knowledge_entry_fts_ai
+        AFTER INSERT ON knowledge_knowledgeentry BEGIN
+            INSERT INTO knowledge_entry_fts(rowid, title, summary, tags, content)
+            VALUES (new.id, new.title, new.summary, new.tags, new.content);
+        END
+    """,
+    'knowledge_entry_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS knowledge_entry_fts_ad
+        AFTER DELETE ON knowledge_knowledgeentry BEGIN
+            INSERT INTO knowledge_entry_fts(knowledge_entry_fts, rowid, title, summary, tags, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.tags, old.content);
+        END
+    """,
+    'knowledge_entry_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS knowledge_entry_fts_au
+        AFTER UPDATE OF title, summary, tags, content ON knowledge_knowledgeentry BEGIN
+            INSERT INTO knowledge_entry_fts(knowledge_entry_fts, rowid, title, summary, tags, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.tags, old.content);
+            INSERT INTO knowledge_entry_fts(rowid, title, summary, tags, content)
+            VALUES (new.id, new.title, new.summary, new.tags, new.content);
+        END
+    """,
+}
+
+FTS_CREATE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_entry_fts USING fts5(
+        title, summary, tags, content,
+        content='knowledge_knowledgeentry',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_fts_index(using=connection):
+    """Create the FTS table and triggers if missing, rebuilding when needed.
+
+    Safe to call repeatedly. SQLite drops triggers when a migration rebuilds
+    the entries table, so this also runs after every ``migrate``.
+    """
+    if not fts_available(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [FTS_TABLE + '%'],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE in existing and existing.issuperset(FTS_TRIGGERS):
+            return False
+        cursor.execute(FTS_CREATE_TABLE)
+        for statement in FTS_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_fts_index(using=connection):
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_fts_query(query):
+    """Translate user input into an FTS5 MATCH expression.
+
+    ``"quoted text"`` becomes a phrase, a trailing ``*`` a prefix query, and
+    everything else is reduced to plain words so FTS5 operators typed by the
+    user cannot produce syntax errors. Terms are ANDed.
+    """
+    parts = []
+    for phrase, term in _QUERY_TOKEN.findall(query):
+        if phrase:
+            words = _WORD.findall(phrase)
+            if words:
+                parts.append('"%s"' % ' '.join(words))
+            continue
+        words = _WORD.findall(term)
+        for index, word in enumerate(words):
+            star = '*' if term.endswith('*') and index == len(words) - 1 else ''
+            parts.append('"%s"%s' % (word, star))
+    return ' '.join(parts)
+
+
+def highlight_snippet(raw):
+    """Escape an FTS5 snippet and turn its markers into <mark> tags."""
+    if not raw:
+        return ''
+    return escape(raw).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_entries(queryset, query, rank=True):
+    """Restrict ``queryset`` to entries matching ``query``.
+
+    With FTS5 the rows are annotated with ``search_rank`` (lower is better)
+    and ``search_snippet``; when ``rank`` is true they are ordered by it.
+    """
+    if not fts_available():
+        queryset = queryset.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(summary__icontains=query) |
+            Q(tags__icontains=query)
+        )
+        return queryset.order_by('-updated_at') if rank else queryset
+
+    match = build_fts_query(query)
+    if not match:
+        return queryset.none()
+
+    # One join on the FTS table: the MATCH selects the rows, and bm25() and
+    # snippet() read the same match through its hidden column
+    document = F('search_index__document')
+    queryset = queryset.filter(search_index__document__match=match).annotate(
+        search_rank=Func(
+            document, *(Value(weight) for weight in BM25_WEIGHTS),
+            function='bm25', output_field=FloatField(),
+        ),
+        search_snippet=Func(
+            document, Value(-1), Value(_MARK_START), Value(_MARK_END), Value('…'), Value(SNIPPET_TOKENS),
+            function='snippet', output_field=CharField(),
+        ),
+    )
+    return queryset.order_by('search_rank') if rank else queryset
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """DRF search backend that answers ``?search=`` from the FTS index.
+
+    List it after ``OrderingFilter`` so results stay in relevance order unless
+    the client asks for an explicit ``?ordering=``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        rank = 'ordering' not in request.query_params
+        return search_entries(queryset, query, rank=rank)
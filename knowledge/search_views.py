@@ -1,37 +1,42 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.db.models.functions import Substr
+from mywebsite.pagination import CappedCountPaginator
 from .models import KnowledgeEntry, Topic
+from .search import search_entries
+import time
+
+
+# Columns the results template needs; content itself is never loaded
+RESULT_FIELDS = [
+    'id', 'slug', 'title', 'summary', 'entry_type', 'is_favorite', 'updated_at',
+    'topic__id', 'topic__name',
+]
 
 
 class KnowledgeSearchView(LoginRequiredMixin, TemplateView):
     template_name = 'knowledge/search_results.html'
-    
+    paginate_by = 20
+    count_limit = 1000
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         query = self.request.GET.get('q', '').strip()
         topic_id = self.request.GET.get('topic')
         entry_type = self.request.GET.get('type')
 
+        page_obj = None
         results = []
         query_time = 0
 
         if query:
-            import time
-            start_time = time.time()
-
-            # Search in title, content, summary, tags
-            search_filter = Q(
-                user=self.request.user,
-            ) & (
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(summary__icontains=query) |
-                Q(tags__icontains=query)
-            )
-
-            results = KnowledgeEntry.objects.filter(search_filter).select_related('topic')
+            start_time = time.perf_counter()
+            # Full-text search in title, summary, tags and content, ranked by relevance
+            results = search_entries(
+                KnowledgeEntry.objects.filter(user=self.request.user).select_related('topic'),
+                query,
+            ).only(*RESULT_FIELDS).annotate(excerpt=Substr('content', 1, 400))
 
             # Apply additional filters
             if topic_id:
@@ -39,22 +44,21 @@ class KnowledgeSearchView(LoginRequiredMixin, TemplateView):
             if entry_type:
                 results = results.filter(entry_type=entry_type)
 
-            results = results.order_by('-updated_at')
-            query_time = time.time() - start_time
-
-        # Get all entries for sidebar (only root entries - no parent)
-        all_entries = KnowledgeEntry.objects.filter(
-            user=self.request.user,
-            parent__isnull=True
-        ).select_related('topic').prefetch_related('children').order_by('topic__name', 'order', 'title')
+            paginator = CappedCountPaginator(results, self.paginate_by, count_limit=self.count_limit)
+            page_obj = paginator.get_page(self.request.GET.get('page'))
+            # Evaluate the page here so the time covers the queries themselves
+            results = list(page_obj.object_list)
+            query_time = time.perf_counter() - start_time
 
         context['query'] = query
         context['results'] = results
-        context['result_count'] = len(results)
-        context['query_time'] = query_time
+        context['page_obj'] = page_obj
+        context['is_paginated'] = bool(page_obj and page_obj.has_other_pages())
+        context['result_count'] = page_obj.paginator.count if page_obj else 0
+        context['result_count_capped'] = bool(page_obj and page_obj.paginator.count_is_capped)
+        context['query_time'] = f'{query_time:.3f}'
         context['topics'] = Topic.objects.all()
         context['selected_topic'] = topic_id
         context['selected_type'] = entry_type
-        context['all_entries'] = all_entries  # For sidebar navigation
 
         return context
@@ -1,49 +1,78 @@
 from rest_framework import serializers
+from mywebsite.sparse_fields import SparseFieldsSerializerMixin
 from .models import Topic, KnowledgeEntry, Resource
-import markdown
+from .search import highlight_snippet
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     subtopics_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Topic
         fields = ['id', 'name', 'slug', 'description', 'parent', 'parent_name', 'subtopics_count', 'created_at']
+        field_dependencies = {'subtopics_count': []}
 
     def get_subtopics_count(self, obj):
-        return obj.subtopics.count()
+        # Annotated by TopicViewSet; other callers fall back to a query
+        total = getattr(obj, 'subtopics_total', None)
+        return obj.subtopics.count() if total is None else total
 
 
-class KnowledgeEntrySerializer(serializers.ModelSerializer):
+class KnowledgeEntrySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
     topic_name = serializers.CharField(source='topic.name', read_only=True)
-    content_html = serializers.SerializerMethodField()
+    content_html = serializers.CharField(source='get_content_html', read_only=True)
     tags_list = serializers.SerializerMethodField()
+    search_snippet = serializers.SerializerMethodField()
 
     class Meta:
         model = KnowledgeEntry
         fields = [
             'id', 'user', 'user_name', 'title', 'slug', 'topic', 'topic_name',
             'entry_type', 'content', 'content_html', 'summary', 'source_url',
-            'tags', 'tags_list', 'is_favorite', 'created_at', 'updated_at'
+            'tags', 'tags_list', 'is_favorite', 'search_snippet', 'created_at', 'updated_at'
         ]
         read_only_fields = ['user']
-
-    def get_content_html(self, obj):
-        return markdown.markdown(obj.content, extensions=['extra', 'codehilite', 'toc'])
+        # Rendering is the expensive part of a list page; clients ask for it
+        list_opt_in_fields = ['content_html']
+        field_dependencies = {
+            'content_html': ['content', *KnowledgeEntry.RENDERED_FIELDS],
+            'tags_list': ['tags'],
+            'search_snippet': [],
+        }
 
     def get_tags_list(self, obj):
         if obj.tags:
             return [tag.strip() for tag in obj.tags.split(',')]
         return []
 
+    def get_search_snippet(self, obj):
+        # Only present on rows returned by a ?search= query
+        snippet = getattr(obj, 'search_snippet', None)
+        return highlight_snippet(snippet) if snippet else None
+
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
 
-class ResourceSerializer(serializers.ModelSerializer):
+class EntryReorderSerializer(serializers.Serializer):
+    """One item of a bulk reorder: new position and, optionally, parent."""
+    id = serializers.IntegerField()
+    order = serializers.IntegerField()
+    parent = serializers.IntegerField(allow_null=True, required=False)
+
+
+class EntryImportSerializer(serializers.Serializer):
+    """A zip archive of markdown files and the defaults to import it with."""
+    file = serializers.FileField()
+    parent = serializers.IntegerField(allow_null=True, required=False)
+    topic = serializers.PrimaryKeyRelatedField(queryset=Topic.objects.all(), allow_null=True, required=False)
+    status = serializers.ChoiceField(choices=KnowledgeEntry.STATUS_CHOICES, default='private')
+
+
+class ResourceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
     topic_name = serializers.CharField(source='topic.name', read_only=True)
 
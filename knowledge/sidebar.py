@@ -0,0 +1,70 @@
+"""
+Per-user cache of the rendered knowledge sidebar tree.
+
+The fragment is the same on every page, so it is rendered once per user and
+kept until an entry or topic changes. The active page is marked afterwards
+with a string overlay instead of being baked into the cached HTML.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from .models import KnowledgeEntry
+
+
+SIDEBAR_CACHE_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = 'knowledge:sidebar:generation'
+
+# The tree template only needs these; content and renders stay unloaded
+SIDEBAR_FIELDS = ['id', 'parent_id', 'slug', 'title', 'is_favorite', 'order']
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+def _user_version_key(user_id):
+    return f'knowledge:sidebar:version:{user_id}'
+
+
+def sidebar_version(user_id):
+    """Token that changes whenever the user's sidebar is invalidated.
+
+    Also used in ETags of pages that embed the sidebar.
+    """
+    generation = cache.get_or_set(GENERATION_KEY, _new_generation, None)
+    version = cache.get_or_set(_user_version_key(user_id), _new_generation, None)
+    return f'{generation}:{version}'
+
+
+def _cache_key(user_id):
+    return f'knowledge:sidebar:{sidebar_version(user_id)}:{user_id}'
+
+
+def invalidate_sidebar(user_id):
+    """Drop the cached sidebar of one user."""
+    cache.set(_user_version_key(user_id), _new_generation(), None)
+
+
+def invalidate_all_sidebars():
+    """Drop every cached sidebar, e.g. after a topic changed."""
+    cache.set(GENERATION_KEY, _new_generation(), None)
+
+
+def render_sidebar_tree(user, current_slug=None):
+    key = _cache_key(user.pk)
+    html = cache.get(key)
+    if html is None:
+        all_entries = KnowledgeEntry.objects.filter(
+            user=user,
+        ).only(*SIDEBAR_FIELDS).order_by('topic__name', 'order', 'title').as_tree()
+        html = render_to_string('knowledge/sidebar_tree.html', {'all_entries': all_entries})
+        cache.set(key, html, SIDEBAR_CACHE_TIMEOUT)
+
+    if current_slug:
+        marker = f'class="sidebar-tree-link" data-slug="{escape(current_slug)}"'
+        html = html.replace(marker, f'class="sidebar-tree-link active-page" data-slug="{escape(current_slug)}"', 1)
+    return html
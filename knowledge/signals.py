@@ -0,0 +1,89 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save
+from django.dispatch import receiver
+from mywebsite.conditional import invalidate_related_names
+from mywebsite.dashboard import invalidate_dashboard_stats
+from mywebsite.feeds import invalidate_feeds
+from .models import KnowledgeEntry, Topic, detach_subtree
+from .search import install_fts_index
+from .sidebar import invalidate_all_sidebars, invalidate_sidebar
+from .stats import invalidate_public_topic_counts
+
+
+@receiver(post_delete, sender=KnowledgeEntry)
+def reroot_children_of_deleted_entry(sender, instance, **kwargs):
+    detach_subtree(instance.pk, instance.tree_path)
+
+
+@receiver(post_save, sender=KnowledgeEntry)
+@receiver(post_delete, sender=KnowledgeEntry)
+def invalidate_entry_sidebar(sender, instance, **kwargs):
+    invalidate_sidebar(instance.user_id)
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_topic_sidebars(sender, instance, **kwargs):
+    invalidate_all_sidebars()
+    # API ETags carry topic_name
+    invalidate_related_names(Topic)
+
+
+@receiver(post_migrate)
+def ensure_fulltext_index(sender, using, **kwargs):
+    # Table rebuilds in later migrations drop the FTS triggers; put them back
+    if sender.name != 'knowledge':
+        return
+    connection = connections[using]
+    if KnowledgeEntry._meta.db_table in connection.introspection.table_names():
+        install_fts_index(connection)
+
+
+@receiver(post_init, sender=KnowledgeEntry)
+def remember_listing_state(sender, instance, **kwargs):
+    # Read __dict__ so deferred fields are not fetched just to be remembered
+    instance._listing_state = (instance.__dict__.get('status'), instance.__dict__.get('topic_id'))
+
+
+@receiver(post_save, sender=KnowledgeEntry)
+def refresh_feed_on_entry_save(sender, instance, **kwargs):
+    # Runs before refresh_counts_on_entry_save moves _listing_state on
+    previous_status = getattr(instance, '_listing_state', (None, None))[0]
+    if instance.status == 'public' or previous_status == 'public':
+        invalidate_feeds('knowledge')
+
+
+@receiver(post_delete, sender=KnowledgeEntry)
+def refresh_feed_on_entry_delete(sender, instance, **kwargs):
+    if instance.__dict__.get('status', 'public') == 'public':
+        invalidate_feeds('knowledge')
+
+
+@receiver(post_save, sender=KnowledgeEntry)
+def refresh_counts_on_entry_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_listing_state', (None, None))
+    current = (instance.status, instance.topic_id)
+    if (created and instance.status == 'public') or (not created and previous != current):
+        invalidate_public_topic_counts()
+    instance._listing_state = current
+
+
+@receiver(post_delete, sender=KnowledgeEntry)
+def refresh_counts_on_entry_delete(sender, instance, **kwargs):
+    if instance.__dict__.get('status', 'public') == 'public':
+        invalidate_public_topic_counts()
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def refresh_counts_on_topic_change(sender, instance, **kwargs):
+    invalidate_public_topic_counts()
+    invalidate_feeds('knowledge')
+
+
+@receiver(post_save, sender=KnowledgeEntry)
+@receiver(post_delete, sender=KnowledgeEntry)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def refresh_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
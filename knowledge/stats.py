@@ -0,0 +1,33 @@
+"""
+Cached per-topic counts of public knowledge entries.
+
+The public note-taking page lists every topic with its number of public
+entries. The counts come from one grouped query and are kept as a cached
+snapshot that signals drop whenever an entry's status or topic changes.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Topic
+
+
+PUBLIC_TOPIC_COUNTS_KEY = 'knowledge:public-topic-counts'
+PUBLIC_TOPIC_COUNTS_TIMEOUT = 60 * 60 * 24
+
+
+async def apublic_topic_counts():
+    """Topics annotated with ``entries_count`` (public entries only)."""
+    topics = await cache.aget(PUBLIC_TOPIC_COUNTS_KEY)
+    if topics is None:
+        topics = [
+            topic async for topic in Topic.objects.annotate(
+                entries_count=Count('entries', filter=Q(entries__status='public'))
+            )
+        ]
+        await cache.aset(PUBLIC_TOPIC_COUNTS_KEY, topics, PUBLIC_TOPIC_COUNTS_TIMEOUT)
+    return topics
+
+
+def invalidate_public_topic_counts():
+    cache.delete(PUBLIC_TOPIC_COUNTS_KEY)
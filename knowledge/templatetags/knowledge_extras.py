@@ -1,4 +1,6 @@
 from django import template
+from django.utils.safestring import mark_safe
+from knowledge.search import highlight_snippet
 
 register = template.Library()
 
@@ -22,4 +24,10 @@ def trim(value):
 @register.filter
 def filter_root_entries(entries):
     """Filter entries to only include root entries (those without a parent)."""
-    return [entry for entry in entries if not entry.parent]
+    return [entry for entry in entries if not entry.parent_id]
+
+
+@register.filter
+def fts_snippet(value):
+    """Render a full-text search snippet with its matches highlighted."""
+    return mark_safe(highlight_snippet(value))
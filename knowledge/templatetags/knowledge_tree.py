@@ -1,4 +1,7 @@
 from django import template
+from django.utils.safestring import mark_safe
+from knowledge.models import link_entry_tree
+from knowledge.sidebar import render_sidebar_tree
 
 register = template.Library()
 
@@ -6,8 +9,8 @@ register = template.Library()
 @register.inclusion_tag('knowledge/entry_tree.html')
 def entry_tree(entries, active_slug=None, current_slug=None, depth=0):
     """Render entries in a nested tree structure"""
-    # Filter root entries (those without parent)
-    root_entries = [e for e in entries if e.parent_id is None]
+    # Link the flat list once; the item template recurses over tree_children
+    root_entries = link_entry_tree(list(entries))
     
     return {
         'entries': root_entries,
@@ -18,6 +21,13 @@ def entry_tree(entries, active_slug=None, current_slug=None, depth=0):
     }
 
 
+@register.simple_tag(takes_context=True)
+def knowledge_sidebar(context):
+    """Render the current user's cached sidebar tree, marking the active page"""
+    request = context['request']
+    return mark_safe(render_sidebar_tree(request.user, context.get('current_slug')))
+
+
 def get_children(entry, all_entries):
     """Get direct children of an entry"""
     return [e for e in all_entries if e.parent_id == entry.id]
@@ -1,3 +1,403 @@
-from django.test import TestCase
+import os
+import tempfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from mywebsite.query_budget import QueryBudgetExceeded
+from .models import KnowledgeEntry, Topic, tree_path_segment
+
+
+class KnowledgeEntryTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='secret')
+        cls.topic = Topic.objects.create(name='Python', slug='python')
+
+    def make_entry(self, slug, parent=None, **kwargs):
+        kwargs.setdefault('content', f'# {slug}\n\nBody of {slug}.')
+        kwargs.setdefault('topic', self.topic)
+        return KnowledgeEntry.objects.create(
+            user=self.user, title=slug.title(), slug=slug, parent=parent, **kwargs
+        )
+
+    def assertTreePathsConsistent(self):
+        parents = dict(KnowledgeEntry.objects.values_list('id', 'parent_id'))
+        for pk, tree_path, depth in KnowledgeEntry.objects.values_list('id', 'tree_path', 'depth'):
+            expected = ''
+            node = pk
+            while node is not None:
+                expected = tree_path_segment(node) + expected
+                node = parents[node]
+            self.assertEqual(tree_path, expected)
+            self.assertEqual(depth, expected.count('/') - 1)
+
+
+class EntryReorderApiTests(KnowledgeEntryTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.root = self.make_entry('root')
+        self.child = self.make_entry('child', parent=self.root)
+        self.other = self.make_entry('other')
+
+    def bulk_reorder(self, changes):
+        return self.client.post(reverse('knowledgeentry-bulk-reorder'), changes, format='json')
+
+    def test_bulk_reorder_moves_and_orders(self):
+        response = self.bulk_reorder([
+            {'id': self.child.pk, 'order': 3, 'parent': self.other.pk},
+            {'id': self.root.pk, 'order': 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'updated': 2, 'moved': 1})
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.parent_id, self.other.pk)
+        self.assertEqual(self.child.order, 3)
+        self.assertEqual(self.child.tree_path, self.other.tree_path + f'{self.child.pk:010d}/')
+
+    def test_bulk_reorder_keeps_tree_paths_consistent(self):
+        grandchild = self.make_entry('grandchild', parent=self.child)
+        response = self.bulk_reorder([
+            {'id': self.root.pk, 'order': 0, 'parent': self.other.pk},
+            {'id': grandchild.pk, 'order': 0, 'parent': None},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['moved'], 2)
+        self.assertTreePathsConsistent()
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.depth, 2)
+
+    def test_bulk_reorder_rejects_other_users_entries(self):
+        stranger = User.objects.create_user('stranger')
+        foreign = KnowledgeEntry.objects.create(user=stranger, title='Foreign', slug='foreign', content='x')
+        for change in ({'id': foreign.pk, 'order': 0}, {'id': self.child.pk, 'order': 0, 'parent': foreign.pk}):
+            response = self.bulk_reorder([change])
+            self.assertEqual(response.status_code, 400)
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.parent_id, self.root.pk)
+
+    def test_patch_rejects_cyclic_parent(self):
+        url = reverse('knowledgeentry-reorder', args=[self.root.pk])
+        for parent in (self.child, self.root):
+            response = self.client.patch(url, {'parent': parent.pk}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.root.refresh_from_db()
+        self.assertIsNone(self.root.parent_id)
+
+    def test_patch_rejects_other_users_parent(self):
+        stranger = User.objects.create_user('stranger')
+        foreign = KnowledgeEntry.objects.create(user=stranger, title='Foreign', slug='foreign', content='x')
+        url = reverse('knowledgeentry-reorder', args=[self.other.pk])
+        response = self.client.patch(url, {'parent': foreign.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_patch_moves_entry(self):
+        url = reverse('knowledgeentry-reorder', args=[self.root.pk])
+        response = self.client.patch(url, {'parent': self.other.pk, 'order': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.child.refresh_from_db()
+        self.assertTrue(self.child.tree_path.startswith(self.other.tree_path))
+        self.assertEqual(self.child.depth, 2)
+
+    def test_bulk_reorder_rejects_cycle(self):
+        response = self.bulk_reorder([
+            {'id': self.root.pk, 'order': 0, 'parent': self.other.pk},
+            {'id': self.other.pk, 'order': 0, 'parent': self.child.pk},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.root.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertIsNone(self.root.parent_id)
+        self.assertIsNone(self.other.parent_id)
+
+
+class TreePathTests(KnowledgeEntryTestMixin, TestCase):
+    def setUp(self):
+        self.a = self.make_entry('a')
+        self.b = self.make_entry('b', parent=self.a)
+        self.c = self.make_entry('c', parent=self.b)
+        self.d = self.make_entry('d', parent=self.c)
+        self.e = self.make_entry('e')
+
+    def test_save_moves_subtree(self):
+        self.b.parent = self.e
+        self.b.save()
+        self.assertTreePathsConsistent()
+        self.assertEqual(KnowledgeEntry.objects.get(pk=self.d.pk).depth, 3)
+
+    def test_reorder_moves_nested_subtrees(self):
+        # a moves below c, its former grandchild, which becomes a root
+        updated, moved = KnowledgeEntry.objects.reorder([
+            {'id': self.c.pk, 'order': 0, 'parent': None},
+            {'id': self.a.pk, 'order': 0, 'parent': self.c.pk},
+            {'id': self.b.pk, 'order': 1, 'parent': self.e.pk},
+        ])
+        self.assertEqual((updated, moved), (3, 3))
+        self.assertTreePathsConsistent()
+        self.assertEqual(KnowledgeEntry.objects.get(pk=self.a.pk).tree_path, tree_path_segment(self.c.pk) + tree_path_segment(self.a.pk))
+
+    def test_rebuild_tree_only_loads_given_rows(self):
+        KnowledgeEntry.objects.filter(pk=self.d.pk).update(tree_path='', depth=0)
+        # The row itself, its parent's path and the update
+        with self.assertNumQueries(3):
+            fixed = KnowledgeEntry.objects.filter(pk=self.d.pk).rebuild_tree()
+        self.assertEqual(fixed, 1)
+        self.assertTreePathsConsistent()
+
+    def test_delete_reroots_children(self):
+        self.b.delete()
+        self.assertTreePathsConsistent()
+        self.assertEqual(KnowledgeEntry.objects.get(pk=self.d.pk).depth, 1)
+
+    def test_delete_reroots_children_by_index_range(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.c.delete()
+        self.assertFalse([query['sql'] for query in queries if 'LIKE' in query['sql']])
+        self.assertTreePathsConsistent()
+
+    def test_delete_reroots_children_below_a_stale_path(self):
+        # As in a cascade: a's signal cuts the prefix off c's row, but the
+        # loaded c still has the old path when it is deleted
+        self.a.delete()
+        self.c.delete()
+        self.assertTreePathsConsistent()
+        self.assertEqual(KnowledgeEntry.objects.get(pk=self.d.pk).depth, 0)
+
+
+class EntryPageQueryBudgetTests(KnowledgeEntryTestMixin, TestCase):
+    """Runs under ``QUERY_BUDGET_ACTION = 'raise'``, so a page that goes over
+    its budget in settings.QUERY_BUDGETS fails with an exception."""
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.root = self.make_entry('root')
+        self.entry = self.make_entry('entry', parent=self.root)
+        self.make_entry('sibling', parent=self.root)
+        for index in range(3):
+            child = self.make_entry(f'child-{index}', parent=self.entry)
+            for number in range(2):
+                self.make_entry(f'grandchild-{index}-{number}', parent=child)
+
+    def test_budgets_raise_under_the_test_runner(self):
+        self.assertEqual(settings.QUERY_BUDGET_ACTION, 'raise')
+        budgets = {**settings.QUERY_BUDGETS, 'knowledge:entry_detail': {'queries': 1}}
+        with override_settings(QUERY_BUDGETS=budgets), self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('knowledge:entry_detail', args=[self.entry.slug]))
+
+    def test_detail_page_shows_child_tree_within_budget(self):
+        response = self.client.get(reverse('knowledge:entry_detail', args=[self.entry.slug]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([child.slug for child in response.context['entry'].tree_children], [
+            'child-0', 'child-1', 'child-2',
+        ])
+        self.assertContains(response, 'Grandchild-2-1')
+
+    def test_detail_page_sends_only_an_etag(self):
+        url = reverse('knowledge:entry_detail', args=[self.entry.slug])
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        KnowledgeEntry.objects.get(slug='child-0').delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_update_page_within_budget(self):
+        response = self.client.get(reverse('knowledge:entry_update', args=[self.entry.slug]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Grandchild-0-0')
+
+    def test_create_child_page_within_budget(self):
+        response = self.client.get(reverse('knowledge:entry_create') + f'?parent={self.entry.pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Child-1')
+
+
+class EntryApiConditionalGetTests(KnowledgeEntryTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.make_entry('first')
+
+    def test_list_etag_follows_topic_name(self):
+        url = reverse('knowledgeentry-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.topic.name = 'Python 3'
+        self.topic.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['topic_name'], 'Python 3')
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_list_etag_follows_deletions(self):
+        self.make_entry('second')
+        url = reverse('knowledgeentry-list')
+        etag = self.client.get(url)['ETag']
+        KnowledgeEntry.objects.get(slug='first').delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class EntryHeadingTests(KnowledgeEntryTestMixin, TestCase):
+    def test_heading_text_is_stored_unescaped(self):
+        entry = self.make_entry('escaped', content='# Fish & Chips <3\n\n## "Quoted"\n')
+        headings = entry.get_headings()
+        self.assertEqual(headings[0]['text'], 'Fish & Chips <3')
+        self.assertEqual(headings[0]['children'][0]['text'], '"Quoted"')
+
+
+class EntrySearchTests(KnowledgeEntryTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.body_match = self.make_entry('body-match', content='Notes that mention asyncio once.')
+        self.title_match = self.make_entry('asyncio-basics', content='Event loops and tasks.')
+        self.make_entry('unrelated', content='Nothing to see here.')
+
+    def search(self, **params):
+        return self.client.get(reverse('knowledgeentry-list'), {'search': 'asyncio', **params})
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self.search().json()['results']
+        self.assertEqual([row['slug'] for row in results], ['asyncio-basics', 'body-match'])
+        self.assertIn('<mark>asyncio</mark>', results[1]['search_snippet'])
+
+    def test_search_with_sparse_fields(self):
+        results = self.search(fields='id,slug').json()['results']
+        self.assertEqual([row['slug'] for row in results], ['asyncio-basics', 'body-match'])
+        self.assertEqual(set(results[0]), {'id', 'slug'})
+
+    def test_search_with_keyset_pages(self):
+        first = self.search(cursor='', page_size=1).json()
+        second = self.client.get(first['next']).json()
+        slugs = [row['slug'] for row in first['results'] + second['results']]
+        self.assertEqual(sorted(slugs), ['asyncio-basics', 'body-match'])
+        self.assertIsNone(second['next'])
+
+    def test_search_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('knowledge:search'), {'q': 'asyncio'})
+        self.assertEqual([entry.slug for entry in response.context['results']], ['asyncio-basics', 'body-match'])
+        self.assertEqual(response.context['result_count'], 2)
+
+    def test_search_page_echoes_query_untouched(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('knowledge:search'), {'q': '__search_query_time__'})
+        self.assertContains(response, '__search_query_time__')
+        float(response.context['query_time'])
+
+
+class MarkdownImportTests(KnowledgeEntryTestMixin, TestCase):
+    FILES = {
+        'guides/index.md': '---\ntitle: Field Guides\ntopic: Django\n---\nAll the guides.\n',
+        'guides/setup.md': (
+            '---\ntags: [install, venv]\nstatus: public\nsummary: "Getting started"\norder: 5\n---\n'
+            '# Setup\n\nSteps.\n'
+        ),
+        'guides/deep/notes.md': '# Notes\n\nNested notes.\n',
+        'notes.md': '# Notes\n\nTop-level notes.\n',
+    }
+
+    def import_files(self, *args):
+        with tempfile.TemporaryDirectory() as root:
+            for name, text in self.FILES.items():
+                path = os.path.join(root, *name.split('/'))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as handle:
+                    handle.write(text)
+            call_command('import_markdown', root, '--username', self.user.username, *args, stdout=open(os.devnull, 'w'))
+
+    def test_folders_become_parent_pages(self):
+        self.import_files()
+        guides = KnowledgeEntry.objects.get(title='Field Guides')
+        deep = KnowledgeEntry.objects.get(title='deep')
+        self.assertIsNone(guides.parent_id)
+        self.assertEqual(deep.parent_id, guides.pk)
+        self.assertEqual(guides.content, 'All the guides.\n')
+        self.assertEqual(KnowledgeEntry.objects.get(title='Setup').parent_id, guides.pk)
+        self.assertEqual(KnowledgeEntry.objects.get(content__contains='Nested').parent_id, deep.pk)
+        self.assertEqual(KnowledgeEntry.objects.filter(title='index').count(), 0)
+
+    def test_front_matter_sets_metadata(self):
+        self.import_files()
+        setup = KnowledgeEntry.objects.select_related('topic').get(title='Setup')
+        self.assertEqual(setup.tags, 'install,venv')
+        self.assertEqual(setup.status, 'public')
+        self.assertEqual(setup.summary, 'Getting started')
+        self.assertEqual(setup.order, 5)
+        # The topic is set on the folder page and passed down
+        self.assertEqual(setup.topic.name, 'Django')
+        self.assertEqual(KnowledgeEntry.objects.get(title='deep').topic_id, setup.topic_id)
+        self.assertEqual(KnowledgeEntry.objects.get(title='Notes', parent=None).status, 'private')
+
+    def test_slug_collisions_in_one_batch(self):
+        self.make_entry('notes')
+        self.import_files()
+        slugs = sorted(KnowledgeEntry.objects.filter(title='Notes').values_list('slug', flat=True))
+        self.assertEqual(slugs, ['notes', 'notes-1', 'notes-2'])
+
+    def test_tree_paths_after_bulk_create(self):
+        parent = self.make_entry('library')
+        self.import_files('--parent', 'library', '--batch-size', '2')
+        self.assertTreePathsConsistent()
+        setup = KnowledgeEntry.objects.get(title='Setup')
+        self.assertTrue(setup.tree_path.startswith(parent.tree_path))
+        self.assertEqual(setup.depth, 2)
+        self.assertEqual(KnowledgeEntry.objects.filter(tree_path__startswith=parent.tree_path).count(), 6)
+
+    def test_unknown_username_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "No user named 'nobody'"):
+            call_command('import_markdown', '.', '--username', 'nobody')
+        self.assertFalse(KnowledgeEntry.objects.exists())
+
+
+class KnowledgeExportTests(KnowledgeEntryTestMixin, TestCase):
+    def snapshot(self, user):
+        """Entries keyed by their chain of ancestor titles, without ids or slugs."""
+        rows = {
+            row.pop('id'): row
+            for row in KnowledgeEntry.objects.filter(user=user).values(
+                'id', 'parent_id', 'title', 'topic__name', 'entry_type', 'status', 'order', 'content',
+                'summary', 'source_url', 'tags', 'is_favorite',
+            )
+        }
+        tree = {}
+        for row in rows.values():
+            titles = []
+            node = row
+            while node is not None:
+                titles.insert(0, node['title'])
+                node = rows.get(node['parent_id'])
+            tree[tuple(titles)] = {key: value for key, value in row.items() if key != 'parent_id'}
+        return tree
+
+    def test_zip_export_imports_back_into_the_same_tree(self):
+        root = self.make_entry(
+            'handbook', status='public', entry_type='research', order=2, summary='The "whole" thing',
+            tags='python,django', is_favorite=True, source_url='https://example.com/handbook',
+        )
+        chapter = self.make_entry('chapter', parent=root, order=1, tags='draft')
+        go = Topic.objects.create(name='Go', slug='go')
+        self.make_entry('index', parent=chapter, topic=go, content='Second line\n\n- item')
+        self.make_entry('loose', status='public')
+        copy = User.objects.create_user('copy')
+
+        with tempfile.TemporaryDirectory() as directory:
+            archive = os.path.join(directory, 'export.zip')
+            with open(os.devnull, 'w') as devnull:
+                call_command('export_knowledge', archive, '--username', 'reader', '--as', 'zip', stderr=devnull)
+                call_command('import_markdown', archive, '--username', 'copy', stdout=devnull)
+
+        self.assertEqual(self.snapshot(copy), self.snapshot(self.user))
+        self.assertTreePathsConsistent()
+
+    def test_unknown_username_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "No user named 'nobody'"):
+            call_command('export_knowledge', '-', '--username', 'nobody')
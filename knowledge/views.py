@@ -4,10 +4,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.db.models import Q
-from .models import KnowledgeEntry, Topic, Resource
+from .models import KnowledgeEntry, Topic, Resource, link_entry_tree
 from .forms import KnowledgeEntryForm, TopicForm, ResourceForm
-import markdown
-import re
+from django.utils.decorators import method_decorator
+from mywebsite.conditional import conditional_page, make_etag
+from mywebsite.rendering import flatten_headings
+from .sidebar import sidebar_version
 import time
 
 
@@ -32,69 +34,80 @@ class KnowledgeEntryListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['topics'] = Topic.objects.all()
+        # Link the page's entries in memory so the tree template does not
+        # query children per entry
+        context['entries'] = list(context['entries'])
+        link_entry_tree(context['entries'])
         return context
 
 
-def extract_headings_from_html(html_content):
-    """Extract headings from HTML content to generate TOC"""
-    headings = []
-    # Match h1, h2, h3, h4, h5, h6 tags
-    pattern = r'<h([1-6]).*?id="([^"]*)".*?>([^<]+)</h[1-6]>'
-    matches = re.finditer(pattern, html_content)
-    
-    for match in matches:
-        level = int(match.group(1))
-        heading_id = match.group(2) if match.group(2) else ''
-        text = match.group(3)
-        # Remove any HTML tags from text
-        text = re.sub(r'<[^>]+>', '', text)
-        headings.append({
-            'level': level,
-            'text': text.strip(),
-            'id': heading_id or text.lower().replace(' ', '-')
-        })
-    
-    return headings
-
-
+def link_child_pages(entry, levels=2):
+    """Load ``levels`` of pages below ``entry`` in one query.
+
+    Sets ``tree_children`` on ``entry`` and every loaded page, which is what
+    the child page trees in the entry templates walk.
+    """
+    descendants = KnowledgeEntry.objects.subtree(entry, include_self=False).filter(
+        user_id=entry.user_id,
+        depth__lte=entry.depth + levels,
+    ).order_by('order', 'title')
+    link_entry_tree([entry, *descendants])
+    return entry.tree_children
+
+
+def entry_detail_validators(request, slug):
+    """The page shows the entry, its siblings and the sidebar tree; every
+    change to the user's entries or topics bumps the sidebar version.
+
+    Only an ETag: the entry's ``updated_at`` does not move when a child or
+    sibling is deleted or a topic renamed."""
+    if not request.user.is_authenticated:
+        return None
+    updated_at = KnowledgeEntry.objects.filter(
+        user=request.user, slug=slug,
+    ).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    etag = make_etag(
+        'knowledge-entry', slug, request.user.pk, updated_at.isoformat(), sidebar_version(request.user.pk),
+    )
+    return etag, None
+
+
+@method_decorator(conditional_page(entry_detail_validators), name='get')
 class KnowledgeEntryDetailView(LoginRequiredMixin, DetailView):
     model = KnowledgeEntry
     template_name = 'knowledge/entry_detail.html'
     context_object_name = 'entry'
 
     def get_queryset(self):
-        return KnowledgeEntry.objects.filter(user=self.request.user).select_related('topic')
+        return KnowledgeEntry.objects.filter(user=self.request.user).select_related('topic', 'parent')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        entry = self.get_object()
+        entry = self.object
+        link_child_pages(entry)
 
-        # Use toc extension to generate IDs for headings
-        content_html = markdown.markdown(
-            entry.content,
-            extensions=['extra', 'codehilite', 'toc']
-        )
-        context['content_html'] = content_html
+        # Stored rendering; only re-rendered when content or config changed
+        context['content_html'] = entry.get_content_html()
 
-        # Extract headings for TOC
-        headings = extract_headings_from_html(content_html)
-        context['toc_items'] = headings
+        # TOC comes from the toc extension tokens stored with the render
+        context['toc_tree'] = entry.get_headings()
+        context['toc_items'] = flatten_headings(context['toc_tree'])
 
         # Get related pages (siblings and children)
-        if entry.parent:
-            context['sibling_pages'] = entry.parent.children.exclude(id=entry.id).order_by('order', 'title')
+        if entry.parent_id:
+            context['sibling_pages'] = KnowledgeEntry.objects.filter(
+                user_id=entry.user_id,
+                parent_id=entry.parent_id,
+            ).exclude(id=entry.id).order_by('order', 'title')
         else:
             context['sibling_pages'] = KnowledgeEntry.objects.filter(
+                user_id=entry.user_id,
                 topic=entry.topic,
                 parent__isnull=True
             ).exclude(id=entry.id).order_by('order', 'title')
 
-        # Get all entries for sidebar (only root entries - no parent)
-        all_entries = KnowledgeEntry.objects.filter(
-            user=self.request.user,
-            parent__isnull=True
-        ).select_related('topic').prefetch_related('children').order_by('topic__name', 'order', 'title')
-        context['all_entries'] = all_entries
         context['current_slug'] = entry.slug
 
         return context
@@ -162,7 +175,8 @@ class KnowledgeEntryCreateView(LoginRequiredMixin, CreateView):
 
         if parent_id:
             try:
-                parent_entry = KnowledgeEntry.objects.get(id=parent_id, user=self.request.user)
+                parent_entry = KnowledgeEntry.objects.select_related('topic').get(id=parent_id, user=self.request.user)
+                link_child_pages(parent_entry, levels=1)
                 context['parent_entry'] = parent_entry
 
                 # Get siblings (other children of the same parent, or same topic if no parent)
@@ -188,13 +202,6 @@ class KnowledgeEntryCreateView(LoginRequiredMixin, CreateView):
             else:
                 context['sidebar_entries'] = []
 
-        # Get all entries for sidebar (only root entries - no parent)
-        all_entries = KnowledgeEntry.objects.filter(
-            user=self.request.user,
-            parent__isnull=True
-        ).select_related('topic').prefetch_related('children').order_by('topic__name', 'order', 'title')
-        context['all_entries'] = all_entries
-
         return context
 
     def get_form_kwargs(self):
@@ -242,7 +249,7 @@ class KnowledgeEntryUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'knowledge/entry_form.html'
 
     def get_queryset(self):
-        return KnowledgeEntry.objects.filter(user=self.request.user)
+        return KnowledgeEntry.objects.filter(user=self.request.user).select_related('topic', 'parent')
 
     def get_success_url(self):
         return reverse_lazy('knowledge:entry_detail', kwargs={'slug': self.object.slug})
@@ -260,6 +267,7 @@ class KnowledgeEntryUpdateView(LoginRequiredMixin, UpdateView):
         context = super().get_context_data(**kwargs)
         context['topics'] = Topic.objects.all()
         context['entry'] = self.object
+        link_child_pages(self.object)
         selected_topic_id = self.object.topic_id
         if selected_topic_id:
             context['selected_topic_id'] = str(selected_topic_id)
@@ -274,16 +282,11 @@ class KnowledgeEntryUpdateView(LoginRequiredMixin, UpdateView):
             context['sibling_pages'] = self.object.parent.children.exclude(id=self.object.id).order_by('order', 'title')
         else:
             context['sibling_pages'] = KnowledgeEntry.objects.filter(
+                user=self.request.user,
                 topic=self.object.topic,
                 parent__isnull=True
             ).exclude(id=self.object.id).order_by('order', 'title')
 
-        # Get all entries for sidebar (only root entries - no parent)
-        all_entries = KnowledgeEntry.objects.filter(
-            user=self.request.user,
-            parent__isnull=True
-        ).select_related('topic').prefetch_related('children').order_by('topic__name', 'order', 'title')
-        context['all_entries'] = all_entries
         context['current_slug'] = self.object.slug
 
         return context
@@ -0,0 +1,40 @@
+"""
+Helpers for the async public views.
+
+Under ASGI an async view only holds a worker thread while an ORM call or
+template render actually runs, instead of for the whole request. These
+helpers keep querysets from being evaluated lazily later (a template
+iterating an unevaluated queryset would query from the event loop and
+fail), and give async views the paginator ``ListView`` uses.
+"""
+
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404
+
+
+async def alist(queryset):
+    """Evaluate ``queryset`` with the async ORM and return a list."""
+    return [obj async for obj in queryset]
+
+
+async def apaginate(queryset, per_page, page_number, strict=False):
+    """Return ``(paginator, page)`` with the page's rows already loaded.
+
+    The count and the page slice go through the async ORM. With ``strict``
+    an invalid page raises ``Http404`` like ``ListView``; otherwise it falls
+    back to the first or last page like ``Paginator.get_page()``.
+    """
+    paginator = Paginator(queryset, per_page)
+    # Seed the cached count so the paginator never runs COUNT(*) synchronously
+    paginator.count = await queryset.acount()
+    if not strict:
+        page = paginator.get_page(page_number)
+    else:
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number or 1)
+        except InvalidPage as exc:
+            raise Http404(f'Invalid page ({page_number}): {exc}')
+    page.object_list = await alist(page.object_list)
+    return paginator, page
@@ -5,6 +5,7 @@ from rest_framework.authtoken.views import obtain_auth_token
 from blog.api_views import CategoryViewSet, PostViewSet
 from tasks.api_views import TaskViewSet, StudySessionViewSet
 from knowledge.api_views import TopicViewSet, KnowledgeEntryViewSet, ResourceViewSet
+from .api_views import DashboardStatsView
 
 router = DefaultRouter()
 
@@ -23,6 +24,7 @@ router.register(r'resources', ResourceViewSet, basename='resource')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('auth/token/', obtain_auth_token, name='api-token-auth'),
     path('auth/', include('rest_framework.urls', namespace='rest_framework')),
 ]
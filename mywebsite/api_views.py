@@ -0,0 +1,13 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .dashboard import get_dashboard_stats
+
+
+class DashboardStatsView(APIView):
+    """Same counters as the admin portal dashboard, as JSON."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_dashboard_stats())
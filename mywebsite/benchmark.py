@@ -0,0 +1,194 @@
+"""
+In-process latency benchmark of every named URL.
+
+Each GET-able named route (public pages, the portal and the API) is
+requested through Django's test client a number of times, and the p50/p95
+latency, the number of queries and the response size are reported. Routes
+with URL arguments are filled from ``SAMPLE_KWARGS`` using rows owned by
+the benchmark user, so run ``seed_knowledge --scale`` first for numbers
+that mean something.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import Client
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+
+from .query_budget import QueryRecorder
+
+
+# Namespaces and routes that are not pages of this site or not safe to GET
+SKIP_NAMESPACES = {'admin', 'rest_framework'}
+SKIP_URLS = {'logout', 'markdownx_upload', 'markdownx_markdownify', 'api-token-auth'}
+
+
+def _blog_category(user):
+    from blog.models import Category
+
+    category = Category.objects.annotate(total=Count('posts')).order_by('-total').first()
+    return category and {'category_slug': category.slug}
+
+
+def _published_post(user):
+    from blog.models import Post
+
+    post = Post.objects.filter(status='published').order_by('-published_at').first()
+    return post and {'slug': post.slug}
+
+
+def _deepest_entry(user):
+    from knowledge.models import KnowledgeEntry
+
+    entry = KnowledgeEntry.objects.filter(user=user).order_by('-depth', 'pk').first()
+    return entry and {'slug': entry.slug}
+
+
+def _first_pk(model_path, owned=True):
+    def sample(user):
+        from django.apps import apps
+
+        queryset = apps.get_model(model_path).objects.order_by('pk')
+        if owned:
+            queryset = queryset.filter(user=user)
+        pk = queryset.values_list('pk', flat=True).first()
+        return {'pk': pk} if pk is not None else None
+    return sample
+
+
+SAMPLE_KWARGS = {
+    'blog:admin_blog_by_category': _blog_category,
+    'blog:post_list_by_category': _blog_category,
+    'blog:post_detail': _published_post,
+    'blog:post_update': _published_post,
+    'blog:post_delete': _published_post,
+    'blog:category_update': _first_pk('blog.Category', owned=False),
+    'blog:category_delete': _first_pk('blog.Category', owned=False),
+    'knowledge:entry_detail': _deepest_entry,
+    'knowledge:entry_update': _deepest_entry,
+    'knowledge:entry_delete': _deepest_entry,
+    'knowledge:topic_update': _first_pk('knowledge.Topic', owned=False),
+    'knowledge:topic_delete': _first_pk('knowledge.Topic', owned=False),
+    'knowledge:resource_update': _first_pk('knowledge.Resource'),
+    'knowledge:resource_delete': _first_pk('knowledge.Resource'),
+    'tasks:task_update': _first_pk('tasks.Task'),
+    'tasks:task_delete': _first_pk('tasks.Task'),
+    'tasks:study_session_update': _first_pk('tasks.StudySession'),
+    'tasks:study_session_delete': _first_pk('tasks.StudySession'),
+    'tasks:list100_update': _first_pk('tasks.List100Item', owned=False),
+    'tasks:list100_delete': _first_pk('tasks.List100Item', owned=False),
+    'category-detail': _first_pk('blog.Category', owned=False),
+    'post-detail': _first_pk('blog.Post', owned=False),
+    'task-detail': _first_pk('tasks.Task'),
+    'studysession-detail': _first_pk('tasks.StudySession'),
+    'topic-detail': _first_pk('knowledge.Topic', owned=False),
+    'knowledgeentry-detail': _first_pk('knowledge.KnowledgeEntry'),
+    'resource-detail': _first_pk('knowledge.Resource'),
+}
+
+
+def _accepts_get(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        # DRF viewset route: only the methods bound to actions are served
+        return 'get' in actions
+    view_class = getattr(callback, 'view_class', None)
+    if view_class is not None:
+        return 'get' in view_class.http_method_names and hasattr(view_class, 'get')
+    return True
+
+
+def named_routes(patterns=None, namespace=None):
+    """Yield ``(view_name, callback)`` for every named, GET-able route once."""
+    seen = set()
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in SKIP_NAMESPACES:
+                continue
+            inner = namespace
+            if pattern.namespace:
+                inner = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            routes = named_routes(pattern.url_patterns, inner)
+        else:
+            if not pattern.name:
+                continue
+            name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+            routes = [(name, pattern.callback)]
+        for name, callback in routes:
+            if name in seen or name in SKIP_URLS or not _accepts_get(callback):
+                continue
+            seen.add(name)
+            yield name, callback
+
+
+def benchmark_targets(user, match=None):
+    """``(view_name, url)`` pairs, plus the names that could not be filled."""
+    targets, skipped = [], []
+    for name, _callback in named_routes():
+        if match and match not in name:
+            continue
+        sample = SAMPLE_KWARGS.get(name)
+        kwargs = sample(user) if sample else {}
+        try:
+            if kwargs is None:
+                raise NoReverseMatch(name)
+            targets.append((name, reverse(name, kwargs=kwargs)))
+        except NoReverseMatch:
+            skipped.append(name)
+    return targets, skipped
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def _content_length(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def benchmark_url(client, url, repeat=20, warmup=2, cold=False):
+    """Time ``repeat`` GETs of ``url`` after ``warmup`` unmeasured ones.
+
+    With ``cold`` the cache is cleared before every request, so cached
+    fragments and pages are rebuilt each time.
+    """
+    timings = []
+    queries = []
+    status = size = None
+    for run in range(warmup + repeat):
+        if cold:
+            cache.clear()
+        recorder = QueryRecorder()
+        with recorder.record():
+            start = time.perf_counter()
+            response = client.get(url)
+            size = _content_length(response)
+            elapsed = time.perf_counter() - start
+        status = response.status_code
+        if run >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(recorder.count)
+    return {
+        'url': url,
+        'status': status,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'queries': max(queries),
+        'bytes': size,
+    }
+
+
+def benchmark_client(user=None):
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != '*' else 'localhost'
+    # A failing view is reported as a 500 row instead of ending the run
+    client = Client(raise_request_exception=False, HTTP_HOST=host)
+    if user is not None:
+        client.force_login(user)
+    return client
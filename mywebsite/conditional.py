@@ -0,0 +1,169 @@
+"""
+Conditional GET (ETag / Last-Modified) for detail pages and the API.
+
+Validators are computed from ``updated_at`` with a light query before the
+view runs, so a matching ``If-None-Match`` / ``If-Modified-Since`` gets a
+304 without loading the full rows, rendering markdown or a template.
+
+``Last-Modified`` is only sent where one timestamp really covers the whole
+representation. Lists and pages that also show related names or other rows
+change on deletes and renames without any newer ``updated_at``, so they
+only carry an ETag.
+"""
+
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from .rendering import render_config_fingerprint
+
+
+def make_etag(*parts):
+    """Digest of everything a representation depends on.
+
+    The markdown configuration is always included because changing it
+    changes the stored rendering without touching ``updated_at``.
+    """
+    digest = hashlib.sha1(render_config_fingerprint().encode('utf-8'))
+    digest.update(repr(parts).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _names_version_key(model):
+    return f'conditional:names:{model._meta.label_lower}'
+
+
+def related_names_version(*models):
+    """Tokens that change whenever a row of one of ``models`` is renamed."""
+    keys = [_names_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_related_names(*models):
+    """Roll the name tokens of ``models``; called from their save signals."""
+    cache.set_many({_names_version_key(model): uuid.uuid4().hex for model in models}, None)
+
+
+def conditional_page(validators):
+    """``condition()`` driven by one ``validators(request, *args, **kwargs)``.
+
+    The function returns ``(etag, last_modified)``, or None to skip
+    conditional handling (e.g. when the object does not exist and the view
+    should produce its own 404). It runs once per request.
+
+    Async views take async validators: ``condition()`` would call them
+    synchronously, so they get their own wrapper.
+    """
+    def cached(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_validators'):
+            request._conditional_validators = validators(request, *args, **kwargs) or (None, None)
+        return request._conditional_validators
+
+    sync_decorator = condition(
+        etag_func=lambda request, *args, **kwargs: cached(request, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: cached(request, *args, **kwargs)[1],
+    )
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return sync_decorator(view)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            etag, latest = await validators(request, *args, **kwargs) or (None, None)
+            etag = quote_etag(etag) if etag else None
+            last_modified = latest.timestamp() if latest else None
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return not_modified
+            response = await view(request, *args, **kwargs)
+            if response.status_code == 200:
+                if etag and not response.has_header('ETag'):
+                    response['ETag'] = etag
+                if last_modified is not None and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(last_modified)
+            return response
+
+        return inner
+
+    return decorator
+
+
+class ConditionalGetMixin:
+    """ETag for DRF ``list`` and ``retrieve``.
+
+    The ETag comes from ``Max(updated_at)`` and ``Count`` over the same
+    filtered queryset the action would serialize, so edits, additions and
+    deletions all change it. The full URL and the negotiated format are
+    part of it, so pages, ``?fields=`` and renderers stay distinct.
+
+    Names the serializer copies from related rows (``topic_name`` and the
+    like) change without touching ``updated_at``. List the foreign keys
+    they come from in ``conditional_related``; the ETag then includes a
+    name token per related model, rolled by that model's save signals
+    (``invalidate_related_names``), instead of scanning the related rows.
+
+    No ``Last-Modified`` is sent: a deletion or a rename leaves
+    ``Max(updated_at)`` where it was, so ``If-Modified-Since`` alone would
+    get a wrong 304.
+    """
+
+    conditional_field = 'updated_at'
+    conditional_related = ()
+
+    def _conditional_validators(self, queryset):
+        state = queryset.order_by().aggregate(
+            latest=Max(self.conditional_field),
+            total=Count('pk'),
+        )
+        related_models = [queryset.model._meta.get_field(name).related_model for name in self.conditional_related]
+        etag = make_etag(
+            queryset.model._meta.label,
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            self.request.user.pk,
+            state['latest'].isoformat() if state['latest'] else None,
+            state['total'],
+            related_names_version(*related_models),
+        )
+        return etag
+
+    def _conditional_response(self, queryset, handler, *args, **kwargs):
+        etag = quote_etag(self._conditional_validators(queryset))
+        not_modified = get_conditional_response(self.request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = handler(self.request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional_response(queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup: let get_object() answer with its 404
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional_response(queryset, super().retrieve, *args, **kwargs)
@@ -0,0 +1,78 @@
+"""
+Admin portal dashboard counters.
+
+Every counter is a conditional aggregate; the per-model aggregates are
+cross-joined so the whole snapshot costs one database round trip. The
+result is cached and dropped by the apps' signal handlers on writes.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q, Value
+from django.utils import timezone
+
+
+DASHBOARD_STATS_KEY = 'portal:dashboard-stats'
+DASHBOARD_STATS_TIMEOUT = 60 * 10
+
+ACTIVE_TASK_STATUSES = ['pending', 'in_progress']
+
+
+def _counters():
+    from blog.models import Category, Post
+    from knowledge.models import KnowledgeEntry, Topic
+    from tasks.models import List100Item, Task
+
+    return [
+        (Post.objects.all(), {'posts_count': Count('pk')}),
+        (Category.objects.all(), {'categories_count': Count('pk')}),
+        (KnowledgeEntry.objects.all(), {'entries_count': Count('pk')}),
+        (Topic.objects.all(), {'topics_count': Count('pk')}),
+        (Task.objects.all(), {
+            'tasks_count': Count('pk'),
+            'active_tasks': Count('pk', filter=Q(status__in=ACTIVE_TASK_STATUSES)),
+        }),
+        (List100Item.objects.all(), {
+            'list100_count': Count('pk'),
+            'list100_completed': Count('pk', filter=Q(status='completed')),
+        }),
+    ]
+
+
+def compute_dashboard_stats():
+    """Run every counter in a single query and return them as a dict."""
+    selects = []
+    params = []
+    names = []
+    for index, (queryset, aggregates) in enumerate(_counters()):
+        # Aggregating over a constant leaves the query ungrouped: always one row
+        sql, sql_params = (
+            queryset.order_by()
+            .values(_all=Value(1))
+            .annotate(**aggregates)
+            .values(*aggregates)
+            .query.sql_with_params()
+        )
+        selects.append(f'({sql}) AS counters_{index}')
+        params.extend(sql_params)
+        names.extend(aggregates)
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT * FROM ' + ', '.join(selects), params)
+        row = cursor.fetchone()
+
+    stats = {name: value or 0 for name, value in zip(names, row)}
+    stats['generated_at'] = timezone.now().isoformat()
+    return stats
+
+
+def get_dashboard_stats():
+    stats = cache.get(DASHBOARD_STATS_KEY)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(DASHBOARD_STATS_KEY, stats, DASHBOARD_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_STATS_KEY)
@@ -0,0 +1,123 @@
+"""
+Stored syndication feeds.
+
+A feed is built with ``django.contrib.syndication`` once after each change
+and the document is written to a file under ``FEED_ROOT``. Every later
+poll, from any worker process, is answered from that file, or with a 304,
+without touching the ORM or rendering markdown (items use the stored
+``rendered_html``). The file's modification time is when the document was
+generated; it is sent as Last-Modified, so it only moves forward, even when
+an unpublished item takes the newest date out of the feed.
+
+Feeds belong to a group (``'blog'``, ``'knowledge'``). Each group keeps its
+documents in a directory named after a version token, stored in the
+group's ``version`` file; the signal handlers roll the token when a
+published item changes, so the next poll rebuilds the document. A document
+that was being built while the token rolled lands in the retired directory
+and is never served.
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+# Items per feed document
+FEED_ITEMS = 20
+
+VERSION_FILE = 'version'
+
+
+def _group_dir(group):
+    return os.path.join(settings.FEED_ROOT, group)
+
+
+def _write_file(path, data):
+    """Replace ``path`` atomically, so readers never see half a document."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(data)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _roll_version(group):
+    directory = _group_dir(group)
+    version = uuid.uuid4().hex
+    _write_file(os.path.join(directory, VERSION_FILE), version.encode('ascii'))
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name != version and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return version
+
+
+def _version(group):
+    try:
+        with open(os.path.join(_group_dir(group), VERSION_FILE), encoding='ascii') as handle:
+            return handle.read().strip() or _roll_version(group)
+    except FileNotFoundError:
+        return _roll_version(group)
+
+
+def invalidate_feeds(*groups):
+    """Retire the stored documents of every feed in ``groups``."""
+    for group in groups:
+        _roll_version(group)
+
+
+class StoredFeedMixin:
+    """Serve a ``Feed`` from its stored document.
+
+    ``feed_group`` names the version token; ``feed_name()`` tells apart
+    the documents of one group (format, category, ...). Documents hold
+    absolute links, so each host gets its own.
+    """
+
+    feed_group = None
+
+    def feed_name(self, request, *args, **kwargs):
+        return type(self).__name__
+
+    def _feed_path(self, request, *args, **kwargs):
+        name = f'{request.get_host()}:{self.feed_name(request, *args, **kwargs)}'
+        return os.path.join(_group_dir(self.feed_group), _version(self.feed_group), quote(name, safe='') + '.xml')
+
+    def __call__(self, request, *args, **kwargs):
+        path = self._feed_path(request, *args, **kwargs)
+        try:
+            document = open(path, 'rb')
+        except FileNotFoundError:
+            # Raises Http404 for a missing object; nothing is stored then
+            response = super().__call__(request, *args, **kwargs)
+            try:
+                _write_file(path, response.content)
+                document = open(path, 'rb')
+            except OSError:
+                # The token rolled while building; serve this copy unstored
+                return response
+
+        with document:
+            stat = os.fstat(document.fileno())
+            etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+            last_modified = int(stat.st_mtime)
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return not_modified
+            response = HttpResponse(document.read(), content_type=self.feed_type.content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
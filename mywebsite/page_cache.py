@@ -0,0 +1,143 @@
+"""
+Full-page cache of the public portal for anonymous visitors.
+
+The homepage, the post lists (all posts and per category, every page), the
+post pages and the List 100 page are stored whole, keyed by path plus
+``?page=``, the only parameter those views read. Logged-in visitors bypass
+the cache, so authors always see their drafts and fresh edits.
+
+Keys embed version tokens instead of being deleted one by one (the local
+memory cache cannot list keys): a generation shared by every page, one
+token for the blog list pages, one per post page, by slug, and one for List
+100. ``blog.signals`` rolls the list token whenever a change is visible to
+the public (a published post saved or deleted, a post published or
+unpublished, a category changed) along with the tokens of the post pages
+involved, so an edit to one post never drops the cached pages of the
+others. ``tasks.signals`` rolls the List 100 token on every item change.
+"""
+
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = 'page-cache:generation'
+LISTS_VERSION_KEY = 'page-cache:blog-lists'
+LIST100_VERSION_KEY = 'page-cache:list100'
+
+# Response headers that are replayed from the cache
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _post_version_key(slug):
+    return f'page-cache:post:{slug}'
+
+
+def lists_scope(request, *args, **kwargs):
+    """Version key for the homepage and the post lists."""
+    return LISTS_VERSION_KEY
+
+
+def post_scope(request, slug, *args, **kwargs):
+    """Version key for one post page."""
+    return _post_version_key(slug)
+
+
+def list100_scope(request, *args, **kwargs):
+    """Version key for the List 100 page."""
+    return LIST100_VERSION_KEY
+
+
+async def _page_key(request, version_key):
+    generation = await cache.aget_or_set(GENERATION_KEY, _new_version, None)
+    version = await cache.aget_or_set(version_key, _new_version, None)
+    page = request.GET.get('page', '')
+    digest = hashlib.sha1(f'{request.path}?page={page}'.encode('utf-8')).hexdigest()
+    return f'page-cache:{generation}:{version}:{digest}'
+
+
+def _cacheable_request(request, user):
+    # A pending flash message is shown once; such a visit renders normally
+    return (
+        request.method in ('GET', 'HEAD')
+        and not user.is_authenticated
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def _replay(request, entry):
+    content, headers = entry
+    etag = headers.get('ETag')
+    last_modified = parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    response = HttpResponse(content)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def anonymous_page_cache(scope):
+    """Cache an async view's 200 responses for anonymous visitors.
+
+    ``scope(request, *args, **kwargs)`` names the version key the page is
+    stored under. Responses that set cookies are never stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            user = await request.auser()
+            if not _cacheable_request(request, user):
+                return await view(request, *args, **kwargs)
+
+            key = await _page_key(request, scope(request, *args, **kwargs))
+            entry = await cache.aget(key)
+            if entry is not None:
+                return _replay(request, entry)
+
+            response = await view(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                # Render now (in a thread, it may touch the database) to store the bytes
+                await sync_to_async(response.render)()
+            if response.status_code == 200 and not response.cookies and not response.streaming:
+                headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+                await cache.aset(key, (response.content, headers), PAGE_CACHE_TIMEOUT)
+            return response
+
+        return inner
+
+    return decorator
+
+
+def invalidate_blog_lists():
+    """Drop the cached homepage and post lists."""
+    cache.set(LISTS_VERSION_KEY, _new_version(), None)
+
+
+def invalidate_post_pages(*slugs):
+    """Drop the cached pages of the given posts."""
+    cache.set_many({_post_version_key(slug): _new_version() for slug in slugs if slug}, None)
+
+
+def invalidate_list100_page():
+    """Drop the cached List 100 page."""
+    cache.set(LIST100_VERSION_KEY, _new_version(), None)
+
+
+def invalidate_all_pages():
+    """Drop every cached page, e.g. after a bulk insert."""
+    cache.set(GENERATION_KEY, _new_version(), None)
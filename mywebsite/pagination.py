@@ -0,0 +1,138 @@
+import binascii
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class CappedCountPaginator(Paginator):
+    """Paginator that stops counting after ``count_limit`` rows.
+
+    Broad queries would otherwise pay for a full ``COUNT(*)`` on every page.
+    ``count_is_capped`` tells templates to show the total as "N+".
+    """
+
+    def __init__(self, object_list, per_page, count_limit=1000, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_limit = count_limit
+        self.count_is_capped = False
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if hasattr(object_list, 'values'):
+            # Count ids only: no ordering and no extra/annotated columns
+            total = object_list.order_by().values('pk')[:self.count_limit + 1].count()
+        else:
+            total = len(object_list)
+        self.count_is_capped = total > self.count_limit
+        return min(total, self.count_limit)
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination over ``(view.cursor_ordering, pk)``.
+
+    The cursor holds the last row's ordering value and primary key, so each
+    page is one indexed range query with no COUNT and no OFFSET, and rows
+    sharing a timestamp are neither skipped nor repeated.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = view.cursor_ordering
+        self.field_name = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        pk_ordering = '-pk' if descending else 'pk'
+
+        queryset = queryset.order_by(ordering, pk_ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            try:
+                value = queryset.model._meta.get_field(self.field_name).to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field_name}__{lookup}': value}) |
+                Q(**{self.field_name: value, f'pk__{lookup}': pk})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(b64decode(encoded.encode('ascii'), altchars=b'-_'))
+            return value, int(pk)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        field = row._meta.get_field(self.field_name)
+        position = json.dumps([field.value_to_string(row), row.pk])
+        return b64encode(position.encode('utf-8'), altchars=b'-_').decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class HybridPagination(PageNumberPagination):
+    """Page numbers by default, keyset pages when ``?cursor=`` is present.
+
+    Only views declaring ``cursor_ordering`` (e.g. ``'-updated_at'``) offer
+    the cursor mode; elsewhere the parameter is ignored.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            KeysetPagination.cursor_query_param in request.query_params
+            and getattr(view, 'cursor_ordering', None)
+        ):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
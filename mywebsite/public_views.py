@@ -1,61 +1,69 @@
+import asyncio
+
 from django.shortcuts import render
-from django.core.paginator import Paginator
+from django.template.response import TemplateResponse
 from blog.models import Post
-from knowledge.models import KnowledgeEntry, Topic
+from knowledge.models import KnowledgeEntry
+from knowledge.stats import apublic_topic_counts
 from tasks.models import List100Item
+from tasks.stats import alist100_stats
+from .aio import alist, apaginate
+from .dashboard import get_dashboard_stats
+from .page_cache import anonymous_page_cache, list100_scope, lists_scope
+
+NOTE_TAKING_PER_PAGE = 12
 
-def home(request):
+# The public pages are async views: under ASGI a request only occupies a
+# worker thread while a query or the template render runs. Independent
+# queries are awaited together, and every queryset is evaluated before the
+# TemplateResponse is returned (Django renders it in a worker thread).
+
+@anonymous_page_cache(lists_scope)
+async def home(request):
     """Public homepage"""
-    recent_posts = Post.objects.filter(status='published').order_by('-published_at')[:3]
-    return render(request, 'public/home.html', {'recent_posts': recent_posts})
+    recent_posts = await alist(
+        Post.objects.filter(status='published').select_related('category').order_by('-published_at')[:3]
+    )
+    return TemplateResponse(request, 'public/home.html', {'recent_posts': recent_posts})
 
-def about(request):
+async def about(request):
     """About me page"""
-    return render(request, 'public/about.html')
+    return TemplateResponse(request, 'public/about.html')
 
-def contact(request):
+async def contact(request):
     """Contact page"""
-    return render(request, 'public/contact.html')
+    return TemplateResponse(request, 'public/contact.html')
 
-def list_100(request):
+@anonymous_page_cache(list100_scope)
+async def list_100(request):
     """List 100 page - public view"""
-    items = List100Item.objects.all()
-    stats = {
-        'total': items.count(),
-        'not_started': items.filter(status='not_started').count(),
-        'in_progress': items.filter(status='in_progress').count(),
-        'completed': items.filter(status='completed').count(),
-    }
-    return render(request, 'public/list_100.html', {
+    items, stats = await asyncio.gather(alist(List100Item.objects.all()), alist100_stats())
+    return TemplateResponse(request, 'public/list_100.html', {
         'items': items,
         'stats': stats,
     })
 
-def note_taking(request):
+async def note_taking(request):
     """Note-taking public page - shows public knowledge entries"""
-    # Get all topics with entry counts (only public entries)
-    topics = Topic.objects.all()
-    for topic in topics:
-        topic.entries_count = KnowledgeEntry.objects.filter(topic=topic, status='public').count()
-    
-    # Filter by topic if selected
-    selected_topic = None
     entries = KnowledgeEntry.objects.filter(status='public').select_related('topic').order_by('-updated_at')
-    
     topic_slug = request.GET.get('topic')
-    if topic_slug:
-        try:
-            selected_topic = Topic.objects.get(slug=topic_slug)
-            entries = entries.filter(topic=selected_topic)
-        except Topic.DoesNotExist:
-            pass
-    
-    # Pagination
-    paginator = Paginator(entries, 12)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    return render(request, 'public/note_taking.html', {
+
+    # Topics with public entry counts come from one grouped query kept in
+    # cache; the entry page is counted and loaded alongside it.
+    filtered = entries.filter(topic__slug=topic_slug) if topic_slug else entries
+    topics, (paginator, page_obj) = await asyncio.gather(
+        apublic_topic_counts(),
+        apaginate(filtered, NOTE_TAKING_PER_PAGE, page_number),
+    )
+    selected_topic = None
+    if topic_slug:
+        selected_topic = next((topic for topic in topics if topic.slug == topic_slug), None)
+        if selected_topic is None:
+            # Unknown topic: show every public entry, as before
+            paginator, page_obj = await apaginate(entries, NOTE_TAKING_PER_PAGE, page_number)
+
+    return TemplateResponse(request, 'public/note_taking.html', {
         'entries': page_obj,
         'topics': topics,
         'selected_topic': selected_topic,
@@ -69,19 +77,7 @@ def admin_portal(request):
         from django.contrib.auth.views import redirect_to_login
         return redirect_to_login(request.get_full_path())
     
-    from blog.models import Category
-    from tasks.models import Task, List100Item
-    
-    # Get counts for dashboard
-    context = {
-        'posts_count': Post.objects.count(),
-        'categories_count': Category.objects.count(),
-        'entries_count': KnowledgeEntry.objects.count(),
-        'topics_count': Topic.objects.count(),
-        'tasks_count': Task.objects.count(),
-        'active_tasks': Task.objects.filter(status__in=['todo', 'in_progress']).count(),
-        'list100_count': List100Item.objects.count(),
-        'list100_completed': List100Item.objects.filter(status='completed').count(),
-    }
-    
+    # All counters come from one cached snapshot (see mywebsite.dashboard)
+    context = get_dashboard_stats()
+
     return render(request, 'admin_portal/dashboard.html', context)
@@ -0,0 +1,167 @@
+"""
+Per-request SQL instrumentation with per-view query budgets.
+
+``QueryBudgetMiddleware`` records every statement a request runs (count,
+total database time, repeated statements) through a connection
+``execute_wrapper``, so it works with ``DEBUG`` off. The numbers are
+compared with ``settings.QUERY_BUDGETS``, keyed by URL name
+(``'namespace:name'``) with a ``'default'`` fallback:
+
+    QUERY_BUDGETS = {
+        'default': {'queries': 30, 'duplicates': 5},
+        'note_taking': {'queries': 6, 'time_ms': 200},
+    }
+
+``settings.QUERY_BUDGET_ACTION`` decides what a breach does: ``'log'``
+writes a warning, ``'raise'`` raises ``QueryBudgetExceeded`` (tests), and
+anything falsy turns the middleware off.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+BUDGET_KEYS = ('queries', 'duplicates', 'time_ms')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that counts statements, time and repeats."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @contextmanager
+    def record(self):
+        """Install the recorder on every configured database connection."""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    @property
+    def duplicates(self):
+        """Statements re-run with identical parameters (N+1 lookups)."""
+        return sum(times - 1 for times in self.statements.values() if times > 1)
+
+    @property
+    def time_ms(self):
+        return self.duration * 1000
+
+    def most_repeated(self):
+        if not self.statements:
+            return None
+        (sql, _params), times = self.statements.most_common(1)[0]
+        return (sql, times) if times > 1 else None
+
+    def measurements(self):
+        return {'queries': self.count, 'duplicates': self.duplicates, 'time_ms': self.time_ms}
+
+
+def budget_for(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    budget = dict(budgets.get('default', {}))
+    if view_name:
+        budget.update(budgets.get(view_name, {}))
+    return budget
+
+
+def check_budget(view_name, recorder):
+    """List of ``(key, measured, limit)`` for every exceeded limit."""
+    budget = budget_for(view_name)
+    measured = recorder.measurements()
+    return [
+        (key, measured[key], budget[key])
+        for key in BUDGET_KEYS
+        if budget.get(key) is not None and measured[key] > budget[key]
+    ]
+
+
+class QueryBudgetMiddleware:
+    """Measure each request's queries and enforce ``QUERY_BUDGETS``.
+
+    Place it first in ``MIDDLEWARE`` so session and auth queries count too.
+    Responses carry a ``Server-Timing: db`` header with the totals. The
+    middleware is sync and async capable, so async views are not pushed
+    through a thread just for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        action = getattr(settings, 'QUERY_BUDGET_ACTION', None)
+        if not action:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.process_measurements(request, response, recorder, action)
+
+    async def __acall__(self, request):
+        action = getattr(settings, 'QUERY_BUDGET_ACTION', None)
+        if not action:
+            return await self.get_response(request)
+
+        # Connections are per thread and the async ORM runs its queries in
+        # the request's sync thread, so the wrapper is installed from there
+        recorder = QueryRecorder()
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(recorder.record())
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.process_measurements(request, response, recorder, action)
+
+    def process_measurements(self, request, response, recorder, action):
+        response['Server-Timing'] = 'db;dur=%.1f;desc="%d queries, %d duplicates"' % (
+            recorder.time_ms, recorder.count, recorder.duplicates,
+        )
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        breaches = check_budget(view_name, recorder)
+        if breaches:
+            message = '%s (%s) over query budget: %s' % (
+                request.path,
+                view_name or 'unresolved',
+                ', '.join('%s %s > %s' % (key, round(value, 1), limit) for key, value, limit in breaches),
+            )
+            repeated = recorder.most_repeated()
+            if repeated:
+                message += '; most repeated (%dx): %s' % (repeated[1], repeated[0])
+            if action == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,43 @@
+"""
+The hot queries of the site and their SQLite query plans.
+
+Each entry builds the queryset a view or endpoint actually runs, so the
+``explain_hot_queries`` command can show which index (if any) answers it.
+Keep the list in step with the views when their queries change.
+"""
+
+from datetime import date
+
+from django.db.models import Count, Q
+
+
+def hot_queries(user_id=1, parent_id=1, topic_id=1):
+    from blog.models import Post
+    from knowledge.models import KnowledgeEntry, Resource, Topic
+    from knowledge.sidebar import SIDEBAR_FIELDS
+    from tasks.models import StudySession, Task
+
+    entries = KnowledgeEntry.objects
+    return [
+        ('Knowledge sidebar tree', entries.filter(user_id=user_id).only(*SIDEBAR_FIELDS).order_by('topic__name', 'order', 'title')),
+        ('Entry detail: sibling pages', entries.filter(user_id=user_id, parent_id=parent_id).order_by('order', 'title')),
+        ('Entry detail: root pages of a topic', entries.filter(user_id=user_id, topic_id=topic_id, parent__isnull=True).order_by('order', 'title')),
+        ('API entries list', entries.filter(user_id=user_id).order_by('-updated_at', '-pk')[:10]),
+        ('Note-taking: public entries', entries.filter(status='public').order_by('-updated_at')[:12]),
+        ('Note-taking: public entries of a topic', entries.filter(status='public', topic_id=topic_id).order_by('-updated_at')[:12]),
+        ('Note-taking: topic counts', Topic.objects.annotate(entries_count=Count('entries', filter=Q(entries__status='public')))),
+        ('Public blog list', Post.objects.filter(status='published').order_by('-created_at')[:10]),
+        ('Homepage recent posts', Post.objects.filter(status='published').order_by('-published_at')[:3]),
+        ('Blog admin: draft count', Post.objects.filter(status='draft').values('pk')),
+        ('Task dashboard: due today', Task.objects.filter(user_id=user_id, due_date=date(2026, 1, 1)).exclude(status='completed')),
+        ('Task dashboard: pending', Task.objects.filter(user_id=user_id, status='pending').order_by('due_date')[:5]),
+        ('Recent study sessions', StudySession.objects.filter(user_id=user_id).order_by('-date')[:5]),
+        ('API resources keyset page', Resource.objects.filter(user_id=user_id).order_by('-updated_at', '-pk')[:11]),
+        ('API study sessions keyset page', StudySession.objects.filter(user_id=user_id).order_by('-created_at', '-pk')[:11]),
+    ]
+
+
+def explain_hot_queries(**ids):
+    """Yield ``(label, sql, plan)`` for every hot query."""
+    for label, queryset in hot_queries(**ids):
+        yield label, str(queryset.query), queryset.explain()
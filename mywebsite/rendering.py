@@ -0,0 +1,140 @@
+"""
+Markdown rendering shared by blog posts and knowledge entries.
+
+Rendering with codehilite/Pygments is the slowest part of a detail page, so
+the HTML is stored next to the source together with a key derived from the
+content and the extension configuration. It is only rebuilt when either of
+them changes.
+"""
+
+import hashlib
+import html
+import json
+
+import markdown
+from django.conf import settings
+from django.db import models
+
+
+# Bump when the shape of the stored rendering changes.
+RENDER_VERSION = 3
+
+
+def markdown_extensions():
+    return list(settings.MARKDOWNX_MARKDOWN_EXTENSIONS)
+
+
+def markdown_extension_configs():
+    return getattr(settings, 'MARKDOWNX_MARKDOWN_EXTENSION_CONFIGS', {})
+
+
+def render_config_fingerprint():
+    """Serialized description of everything that influences the output."""
+    return json.dumps(
+        {
+            'version': RENDER_VERSION,
+            'markdown': markdown.__version__,
+            'extensions': markdown_extensions(),
+            'configs': markdown_extension_configs(),
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+
+def render_key(content, fingerprint=None):
+    """Hash of the content plus the extension configuration."""
+    digest = hashlib.sha256()
+    digest.update((fingerprint or render_config_fingerprint()).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update((content or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _heading_tree(tokens):
+    """Keep the parts of the toc extension's tokens the templates use.
+
+    The extension HTML-escapes ``name``; it is stored as plain text because
+    templates escape it again on output.
+    """
+    return [
+        {
+            'level': token['level'],
+            'id': token['id'],
+            'text': html.unescape(token['name']),
+            'children': _heading_tree(token.get('children', [])),
+        }
+        for token in tokens
+    ]
+
+
+def flatten_headings(headings):
+    """Depth-first list of ``{level, id, text}`` dicts from a heading tree."""
+    flat = []
+    for heading in headings:
+        flat.append({'level': heading['level'], 'id': heading['id'], 'text': heading['text']})
+        flat.extend(flatten_headings(heading['children']))
+    return flat
+
+
+def render_markdown(content):
+    """Render markdown once and return ``(html, toc_html, heading_tree)``.
+
+    The heading tree comes from the toc extension's own tokens, so headings
+    with inline markup are captured without scanning the HTML again.
+    """
+    md = markdown.Markdown(
+        extensions=markdown_extensions(),
+        extension_configs=markdown_extension_configs(),
+    )
+    html = md.convert(content or '')
+    return html, getattr(md, 'toc', ''), _heading_tree(getattr(md, 'toc_tokens', []))
+
+
+class RenderedMarkdownModel(models.Model):
+    """Abstract base that keeps a stored rendering of ``content``."""
+
+    rendered_html = models.TextField(blank=True, default='', editable=False)
+    rendered_toc = models.TextField(blank=True, default='', editable=False)
+    rendered_headings = models.JSONField(blank=True, default=list, editable=False)
+    rendered_key = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    RENDERED_FIELDS = ['rendered_html', 'rendered_toc', 'rendered_headings', 'rendered_key']
+
+    class Meta:
+        abstract = True
+
+    def refresh_rendered_content(self, force=False):
+        """Re-render if the stored output is stale. Returns True if it was."""
+        key = render_key(self.content)
+        if not force and key == self.rendered_key:
+            return False
+        self.rendered_html, self.rendered_toc, self.rendered_headings = render_markdown(self.content)
+        self.rendered_key = key
+        return True
+
+    def ensure_rendered(self):
+        """Re-render and persist the stored output if it went stale."""
+        if self.refresh_rendered_content() and self.pk:
+            # Plain UPDATE so a cache refill does not touch updated_at
+            type(self)._default_manager.filter(pk=self.pk).update(
+                **{field: getattr(self, field) for field in self.RENDERED_FIELDS}
+            )
+
+    def get_content_html(self):
+        self.ensure_rendered()
+        return self.rendered_html
+
+    def get_headings(self):
+        """Nested ``{level, id, text, children}`` headings from the same render."""
+        self.ensure_rendered()
+        return self.rendered_headings
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_rendered_content()
+        elif 'content' in update_fields:
+            self.refresh_rendered_content()
+            kwargs['update_fields'] = set(update_fields) | set(self.RENDERED_FIELDS)
+        super().save(*args, **kwargs)
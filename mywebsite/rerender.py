@@ -0,0 +1,141 @@
+"""
+Parallel re-render of every stored markdown rendering.
+
+Changing ``MARKDOWNX_MARKDOWN_EXTENSIONS``, their configs, the markdown
+version or ``RENDER_VERSION`` makes every ``rendered_key`` stale. Pages
+would re-render lazily on first view, one request at a time; this renders
+them all up front across a process pool instead.
+
+Rows are scanned by primary key; the ones whose key no longer matches are
+sent to the workers in chunks, and the results are written back with
+``bulk_update`` (one transaction per chunk, ``updated_at`` untouched). The
+stored key is the checkpoint: an interrupted run leaves finished chunks
+fresh, and running again picks up from the stale rows that are left.
+"""
+
+import multiprocessing
+
+import django
+from django.apps import apps
+from django.db import connections, transaction
+
+from .rendering import RenderedMarkdownModel, render_config_fingerprint, render_key, render_markdown
+
+
+RERENDER_CHUNK_SIZE = 50
+# Chunks in flight per worker; bounds memory while keeping workers busy
+CHUNKS_PER_WORKER = 4
+
+
+def rendered_models():
+    """Every concrete model that stores a rendering of its ``content``."""
+    return [model for model in apps.get_models() if issubclass(model, RenderedMarkdownModel)]
+
+
+def _init_worker():
+    # No-op after fork; sets Django up when processes are spawned
+    django.setup()
+
+
+def render_chunk(rows):
+    """``[(pk, content)]`` -> ``[(pk, html, toc, headings, key)]``."""
+    fingerprint = render_config_fingerprint()
+    return [(pk, *render_markdown(content), render_key(content, fingerprint)) for pk, content in rows]
+
+
+class Rerenderer:
+    """Re-render the stale rows of ``models`` with ``workers`` processes.
+
+    ``progress(model, scanned, total, rendered)`` is called after each
+    window of chunks is written. ``run()`` returns ``{label: rendered}``.
+    """
+
+    def __init__(self, models=None, workers=None, chunk_size=RERENDER_CHUNK_SIZE, progress=None):
+        self.models = models or rendered_models()
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.fingerprint = render_config_fingerprint()
+
+    def run(self):
+        if self.workers == 1:
+            return self._run(map)
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with multiprocessing.Pool(self.workers, initializer=_init_worker) as pool:
+            return self._run(pool.map)
+
+    def _run(self, map_chunks):
+        results = {}
+        for model in self.models:
+            results[model._meta.label] = self._rerender(model, map_chunks)
+        return results
+
+    def _stale_window(self, model, after_pk):
+        """Up to one window of stale chunks after ``after_pk``.
+
+        Returns ``(chunks, last scanned pk, rows scanned)``.
+        """
+        chunks = []
+        current = []
+        scanned = 0
+        limit = self.workers * CHUNKS_PER_WORKER
+        while len(chunks) < limit:
+            rows = list(
+                model._default_manager.filter(pk__gt=after_pk)
+                .order_by('pk')
+                .values_list('pk', 'content', 'rendered_key')[:self.chunk_size]
+            )
+            if not rows:
+                break
+            scanned += len(rows)
+            after_pk = rows[-1][0]
+            for pk, content, key in rows:
+                if key != render_key(content, self.fingerprint):
+                    current.append((pk, content))
+                    if len(current) == self.chunk_size:
+                        chunks.append(current)
+                        current = []
+        if current:
+            chunks.append(current)
+        return chunks, after_pk, scanned
+
+    def _write(self, model, rendered):
+        objects = []
+        for pk, html, toc, headings, key in rendered:
+            obj = model(pk=pk)
+            obj.rendered_html, obj.rendered_toc, obj.rendered_headings, obj.rendered_key = html, toc, headings, key
+            objects.append(obj)
+        # A row edited meanwhile gets an older rendering here, but its key
+        # no longer matches its content, so ensure_rendered() fixes it on read
+        with transaction.atomic():
+            model._default_manager.bulk_update(objects, model.RENDERED_FIELDS)
+
+    def _rerender(self, model, map_chunks):
+        total = model._default_manager.count()
+        scanned = rendered = 0
+        after_pk = 0
+        while True:
+            chunks, after_pk, window_scanned = self._stale_window(model, after_pk)
+            if not window_scanned:
+                break
+            scanned += window_scanned
+            for result in map_chunks(render_chunk, chunks):
+                self._write(model, result)
+                rendered += len(result)
+            if self.progress:
+                self.progress(model, scanned, total, rendered)
+        return rendered
+
+
+def rerender_all(workers=None, chunk_size=RERENDER_CHUNK_SIZE, models=None, progress=None):
+    """Re-render every stale rendering and drop the caches holding old HTML."""
+    from .feeds import invalidate_feeds
+    from .page_cache import invalidate_all_pages
+
+    results = Rerenderer(models, workers, chunk_size, progress).run()
+    if any(results.values()):
+        # bulk_update sends no signals
+        invalidate_all_pages()
+        invalidate_feeds('blog', 'knowledge')
+    return results
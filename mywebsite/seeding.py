@@ -0,0 +1,277 @@
+"""
+Scale data for performance work.
+
+``seed_scale()`` creates a batch of users, each with a deep knowledge-entry
+tree, tasks and study sessions, plus blog posts spread across them. Every
+table is filled with ``bulk_create``; the markdown bodies come from a small
+pool that is rendered once, so seeding thousands of rows does not mean
+thousands of Pygments runs. Seeded rows are recognisable by their username
+or slug prefix and ``clear_scale()`` removes them again.
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .rendering import render_config_fingerprint, render_key, render_markdown
+
+
+DEFAULT_PREFIX = 'seed'
+BATCH_SIZE = 500
+BODY_POOL_SIZE = 40
+
+WORDS = (
+    'ghi chú', 'hệ thống', 'dữ liệu', 'truy vấn', 'chỉ mục', 'bộ nhớ đệm', 'kiến trúc',
+    'thuật toán', 'phân tích', 'tối ưu', 'mô hình', 'triển khai', 'kiểm thử', 'giao diện',
+    'cấu trúc', 'hiệu năng', 'máy chủ', 'luồng xử lý', 'tài liệu', 'phương pháp',
+)
+
+TOPICS = ('Lập trình', 'Cơ sở dữ liệu', 'Hệ thống', 'Học máy', 'Phương pháp học', 'Đọc sách')
+
+CODE_SAMPLES = (
+    ('python', 'def chunked(items, size):\n    for start in range(0, len(items), size):\n        yield items[start:start + size]\n'),
+    ('sql', 'SELECT user_id, COUNT(*)\nFROM knowledge_knowledgeentry\nWHERE status = \'public\'\nGROUP BY user_id;\n'),
+    ('javascript', 'const debounce = (fn, ms) => {\n  let timer;\n  return (...args) => {\n    clearTimeout(timer);\n    timer = setTimeout(() => fn(...args), ms);\n  };\n};\n'),
+    ('bash', 'python manage.py migrate\npython manage.py runserver 0.0.0.0:8000\n'),
+)
+
+
+def _sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _title(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def markdown_body(rng, sections=4):
+    """Markdown with headings, lists, code blocks and a table."""
+    parts = [f'# {_title(rng)}', '', _sentence(rng, 20), '']
+    for index in range(sections):
+        parts += [f'## {index + 1}. {_title(rng)}', '', _sentence(rng, 30), '']
+        kind = index % 3
+        if kind == 0:
+            language, code = rng.choice(CODE_SAMPLES)
+            parts += [f'```{language}', code.rstrip('\n'), '```', '']
+        elif kind == 1:
+            parts += ['| Mục | Giá trị | Ghi chú |', '|---|---|---|']
+            parts += [f'| {_title(rng)} | {rng.randint(1, 999)} | {rng.choice(WORDS)} |' for _ in range(4)]
+            parts.append('')
+        else:
+            parts += [f'- {_sentence(rng, 6)}' for _ in range(4)]
+            parts += ['', f'> {_sentence(rng, 10)}', '']
+    return '\n'.join(parts)
+
+
+class BodyPool:
+    """A fixed set of markdown bodies, each rendered once."""
+
+    def __init__(self, rng, size=BODY_POOL_SIZE):
+        fingerprint = render_config_fingerprint()
+        self.bodies = []
+        for _ in range(size):
+            content = markdown_body(rng, sections=rng.randint(2, 6))
+            html, toc, headings = render_markdown(content)
+            self.bodies.append({
+                'content': content,
+                'rendered_html': html,
+                'rendered_toc': toc,
+                'rendered_headings': headings,
+                'rendered_key': render_key(content, fingerprint),
+            })
+
+    def pick(self, rng):
+        return dict(rng.choice(self.bodies))
+
+
+def _create_users(count, prefix):
+    User = get_user_model()
+    password = make_password(prefix)
+    users = [
+        User(username=f'{prefix}-user-{index:04d}', email=f'{prefix}-{index}@example.com', password=password)
+        for index in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+
+def _create_topics(prefix):
+    from knowledge.models import Topic
+
+    topics = []
+    for index, name in enumerate(TOPICS):
+        topic, _ = Topic.objects.get_or_create(
+            slug=f'{prefix}-topic-{index}',
+            defaults={'name': name, 'description': f'{name} ({prefix})'},
+        )
+        topics.append(topic)
+    return topics
+
+
+def _create_entries(rng, pool, users, topics, per_user, depth, prefix):
+    """Build each user's tree level by level so parents have primary keys."""
+    from knowledge.models import KnowledgeEntry
+
+    levels = depth + 1
+    per_level = [per_user // levels + (1 if level < per_user % levels else 0) for level in range(levels)]
+    previous = {user.pk: [] for user in users}
+    total = 0
+    for level, count in enumerate(per_level):
+        batch = []
+        for user in users:
+            parents = previous[user.pk]
+            for _ in range(count):
+                if level and not parents:
+                    break
+                parent = rng.choice(parents) if level else None
+                number = total + len(batch)
+                batch.append(KnowledgeEntry(
+                    user=user,
+                    title=_title(rng),
+                    slug=f'{prefix}-entry-{number}',
+                    topic=parent.topic if parent else rng.choice(topics),
+                    parent=parent,
+                    order=rng.randint(0, 50),
+                    entry_type=rng.choice(KnowledgeEntry.TYPE_CHOICES)[0],
+                    status='public' if rng.random() < 0.3 else 'private',
+                    summary=_sentence(rng, 15),
+                    tags=','.join(rng.sample(WORDS, 3)),
+                    is_favorite=rng.random() < 0.05,
+                    **pool.pick(rng),
+                ))
+        created = KnowledgeEntry.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        total += len(created)
+        previous = {user.pk: [] for user in users}
+        for entry in created:
+            previous[entry.user_id].append(entry)
+
+    # bulk_create skips save(), which is what maintains the paths
+    KnowledgeEntry.objects.filter(user__in=users).rebuild_tree()
+    return total
+
+
+def _create_posts(rng, pool, users, count, prefix, now):
+    from blog.models import Category, Post
+
+    categories = []
+    for index, name in enumerate(TOPICS):
+        category, _ = Category.objects.get_or_create(
+            slug=f'{prefix}-category-{index}', defaults={'name': name},
+        )
+        categories.append(category)
+
+    posts = []
+    for number in range(count):
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 730))
+        published = rng.random() < 0.8
+        posts.append(Post(
+            title=_title(rng),
+            slug=f'{prefix}-post-{number}',
+            author=rng.choice(users),
+            category=rng.choice(categories),
+            excerpt=_sentence(rng, 25),
+            status='published' if published else 'draft',
+            created_at=created_at,
+            published_at=created_at if published else None,
+            **pool.pick(rng),
+        ))
+    return len(Post.objects.bulk_create(posts, batch_size=BATCH_SIZE))
+
+
+def _create_tasks(rng, users, per_user, now):
+    from tasks.models import Task
+
+    tasks = []
+    for user in users:
+        for _ in range(per_user):
+            status = rng.choice(Task.STATUS_CHOICES)[0]
+            tasks.append(Task(
+                user=user,
+                title=_title(rng),
+                description=_sentence(rng, 20),
+                task_type=rng.choice(Task.TYPE_CHOICES)[0],
+                priority=rng.choice(Task.PRIORITY_CHOICES)[0],
+                status=status,
+                due_date=(now + timedelta(days=rng.randint(-60, 60))).date() if rng.random() < 0.8 else None,
+                completed_at=now - timedelta(days=rng.randint(0, 60)) if status == 'completed' else None,
+            ))
+    return len(Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE))
+
+
+def _create_sessions(rng, users, per_user, now):
+    from tasks.models import StudySession
+
+    sessions = [
+        StudySession(
+            user=user,
+            subject=_title(rng),
+            description=_sentence(rng, 10),
+            duration_minutes=rng.choice((25, 30, 45, 60, 90, 120)),
+            date=(now - timedelta(days=rng.randint(0, 365))).date(),
+            notes=_sentence(rng, 20),
+        )
+        for user in users
+        for _ in range(per_user)
+    ]
+    return len(StudySession.objects.bulk_create(sessions, batch_size=BATCH_SIZE))
+
+
+def _invalidate_caches():
+    from .page_cache import invalidate_all_pages
+    from knowledge.sidebar import invalidate_all_sidebars
+    from knowledge.stats import invalidate_public_topic_counts
+    from .dashboard import invalidate_dashboard_stats
+    from .feeds import invalidate_feeds
+
+    # bulk_create sends no post_save, so the signal handlers never ran
+    invalidate_all_pages()
+    invalidate_all_sidebars()
+    invalidate_public_topic_counts()
+    invalidate_dashboard_stats()
+    invalidate_feeds('blog', 'knowledge')
+
+
+def seed_scale(users=10, entries=200, depth=5, posts=2000, tasks=300, sessions=300,
+               prefix=DEFAULT_PREFIX, seed=None):
+    """Create the scale data set and return the row counts per model.
+
+    ``entries``, ``tasks`` and ``sessions`` are per user; ``posts`` is the
+    total. Entry trees are ``depth`` levels below their roots.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    pool = BodyPool(rng)
+    with transaction.atomic():
+        created_users = _create_users(users, prefix)
+        topics = _create_topics(prefix)
+        counts = {
+            'users': len(created_users),
+            'entries': _create_entries(rng, pool, created_users, topics, entries, depth, prefix),
+            'posts': _create_posts(rng, pool, created_users, posts, prefix, now),
+            'tasks': _create_tasks(rng, created_users, tasks, now),
+            'study_sessions': _create_sessions(rng, created_users, sessions, now),
+        }
+    _invalidate_caches()
+    return counts
+
+
+def scale_users(prefix=DEFAULT_PREFIX):
+    return get_user_model().objects.filter(username__startswith=f'{prefix}-user-')
+
+
+def clear_scale(prefix=DEFAULT_PREFIX):
+    """Delete everything ``seed_scale()`` created with ``prefix``."""
+    from blog.models import Category
+    from knowledge.models import Topic
+
+    with transaction.atomic():
+        # Users cascade to their entries, posts, tasks and sessions
+        deleted, _ = scale_users(prefix).delete()
+        deleted += Category.objects.filter(slug__startswith=f'{prefix}-category-').delete()[0]
+        deleted += Topic.objects.filter(slug__startswith=f'{prefix}-topic-').delete()[0]
+    _invalidate_caches()
+    return deleted
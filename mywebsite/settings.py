@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
+from .sqlite import sqlite_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mywebsite.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +62,26 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'mywebsite.urls'
 
+# Per-view SQL budgets checked by mywebsite.query_budget.QueryBudgetMiddleware.
+# Keys are URL names ('namespace:name'); 'default' covers every other view.
+# Logged-in requests spend 2 queries on the session and user.
+QUERY_BUDGETS = {
+    'default': {'queries': 15, 'duplicates': 2},
+    'home': {'queries': 6},
+    'note_taking': {'queries': 6},
+    'list_100': {'queries': 5},
+    'blog:post_list': {'queries': 6},
+    'blog:post_detail': {'queries': 6},
+    'knowledge:entry_list': {'queries': 8},
+    'knowledge:entry_detail': {'queries': 10},
+    'knowledge:search': {'queries': 8},
+    # Bulk imports write in batches; their query count grows with the upload
+    'knowledgeentry-import-archive': {'queries': None, 'duplicates': None},
+}
+
+# 'log' warns about a breach, 'raise' fails the request; empty disables it
+QUERY_BUDGET_ACTION = 'raise' if 'test' in sys.argv else ('log' if DEBUG else '')
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,10 +105,21 @@ WSGI_APPLICATION = 'mywebsite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Applied to every new SQLite connection, see mywebsite/sqlite.py
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -20000,  # negative: KiB, so ~20 MB per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': sqlite_options(SQLITE_PRAGMAS),
     }
 }
 
@@ -130,6 +165,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Stored RSS/Atom documents, shared by every worker (see mywebsite.feeds)
+FEED_ROOT = BASE_DIR / 'feeds'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -149,7 +187,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'mywebsite.pagination.HybridPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -0,0 +1,107 @@
+"""
+Unique slug allocation shared by posts, categories, topics and entries.
+
+Finding the next free ``base-N`` slug takes one query: the slug column is
+unique (so indexed) and every candidate sorts between ``base-`` and
+``base.``, which SQLite answers with an index range scan. Only slugs of
+the exact ``base-N`` form count, and the database returns just whether
+``base`` is taken and the highest ``N``, however many there are. Allocation in
+``clean()`` can still race with a concurrent create, so the form mixin
+retries the save with a fresh suffix when the unique constraint fires.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+
+SLUG_SAVE_ATTEMPTS = 5
+
+# Letters NFKD normalization does not reduce to ASCII, as in slug-generator.js
+_TRANSLITERATE = str.maketrans({'đ': 'd', 'Đ': 'D'})
+
+
+def base_slug(text, max_length=50, fallback='item'):
+    slug = slugify((text or '').translate(_TRANSLITERATE))[:max_length].strip('-')
+    return slug or fallback
+
+
+def allocate_slug(queryset, base, exclude_pk=None, field='slug', max_length=50):
+    """Return ``base`` or the next free ``base-N`` slug in ``queryset``."""
+    candidates = queryset.order_by().filter(
+        Q(**{field: base}) |
+        Q(**{
+            f'{field}__gt': base + '-',
+            f'{field}__lt': base + '.',
+            f'{field}__regex': r'^%s-\d+$' % re.escape(base),
+        })
+    )
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+
+    taken = candidates.aggregate(
+        base_taken=Count('pk', filter=Q(**{field: base})),
+        highest=Max(Cast(Substr(field, len(base) + 2), IntegerField()), filter=~Q(**{field: base})),
+    )
+    if not taken['base_taken']:
+        return base
+    slug = f'{base}-{(taken["highest"] or 0) + 1}'
+    if len(slug) > max_length:
+        # Shorten the base to make room for the suffix; rare, costs a query
+        shorter = base[:max_length - (len(slug) - len(base))].rstrip('-')
+        return allocate_slug(queryset, shorter, exclude_pk, field, max_length)
+    return slug
+
+
+class SlugAllocationMixin:
+    """ModelForm mixin that fills ``slug`` from ``slug_source_field``.
+
+    A blank slug, or one equal to the slugified source (what
+    slug-generator.js fills in), is treated as automatic and gets a free
+    suffix instead of failing the unique check.
+    """
+
+    slug_source_field = 'title'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['slug'].required = False
+        self.slug_allocated = False
+
+    def _slug_max_length(self):
+        return self._meta.model._meta.get_field('slug').max_length
+
+    def _allocate_slug(self, source):
+        max_length = self._slug_max_length()
+        return allocate_slug(
+            self._meta.model._default_manager.all(),
+            base_slug(source, max_length),
+            exclude_pk=self.instance.pk,
+            max_length=max_length,
+        )
+
+    def clean_slug(self):
+        slug = self.cleaned_data.get('slug')
+        source = self.cleaned_data.get(self.slug_source_field)
+        if source and (not slug or slug == base_slug(source, self._slug_max_length())):
+            slug = self._allocate_slug(source)
+            self.slug_allocated = True
+        return slug
+
+    def save(self, commit=True):
+        if not commit or not self.slug_allocated:
+            return super().save(commit=commit)
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return super().save(commit=True)
+            except IntegrityError:
+                # Only a concurrent create that took the same slug is retried
+                model = self._meta.model
+                clash = model._default_manager.filter(slug=self.instance.slug).exclude(pk=self.instance.pk)
+                if attempt == SLUG_SAVE_ATTEMPTS - 1 or not clash.exists():
+                    raise
+                self.instance.slug = self._allocate_slug(self.cleaned_data[self.slug_source_field])
@@ -0,0 +1,88 @@
+"""
+Sparse fieldsets for the REST API.
+
+``?fields=a,b`` keeps only the listed fields and ``?omit=c`` drops fields
+from read responses. Fields named in a serializer's
+``Meta.list_opt_in_fields`` (the rendered ``content_html``) are left out of
+list responses unless ``?fields=`` asks for them. The viewset mixin then
+defers every column none of the remaining fields reads, so large text
+columns are not even loaded.
+"""
+
+from rest_framework.permissions import SAFE_METHODS
+
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _param_set(request, name):
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    """Trim serializer fields from the request's ``fields``/``omit`` params.
+
+    ``Meta.field_dependencies`` maps computed fields to the model fields
+    they read, so the view knows which columns may be deferred.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        requested = _param_set(request, FIELDS_PARAM)
+        omitted = _param_set(request, OMIT_PARAM)
+        opt_in = set()
+        if getattr(self.context.get('view'), 'action', None) == 'list':
+            opt_in = set(getattr(self.Meta, 'list_opt_in_fields', ()))
+
+        for name in list(fields):
+            if requested and name not in requested:
+                fields.pop(name)
+            elif name in omitted or (name in opt_in and name not in requested):
+                fields.pop(name)
+        return fields
+
+    def get_required_model_fields(self):
+        """Names of the model fields the kept fields read, or None if unknown."""
+        opts = self.Meta.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        dependencies = getattr(self.Meta, 'field_dependencies', {})
+        required = {opts.pk.name}
+        for name, field in self.fields.items():
+            if name in dependencies:
+                required.update(dependencies[name])
+                continue
+            root = field.source.split('.')[0]
+            if root not in concrete:
+                # A computed field without declared dependencies may read anything
+                return None
+            required.add(root)
+        return required
+
+
+class SparseFieldsViewMixin:
+    """Defer the columns that the requested fields do not need."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        if not hasattr(serializer, 'get_required_model_fields'):
+            return queryset
+        required = serializer.get_required_model_fields()
+        if required is None:
+            return queryset
+        if isinstance(queryset.query.select_related, dict):
+            # A relation followed with select_related() cannot be deferred
+            required = required | set(queryset.query.select_related)
+        deferred = [
+            field.name for field in queryset.model._meta.concrete_fields
+            if field.name not in required
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
@@ -0,0 +1,57 @@
+"""
+SQLite connection tuning.
+
+Every new connection runs the ``PRAGMA`` statements built from
+``settings.SQLITE_PRAGMAS`` (through the backend's ``init_command``
+option), and write transactions start with ``BEGIN IMMEDIATE``
+(``transaction_mode``), so two requests that both read before writing do
+not deadlock on the lock upgrade and fail with "database is locked".
+
+WAL lets readers run while a write commits, ``synchronous = NORMAL`` only
+syncs at checkpoints (safe in WAL mode; a power cut may lose the last
+commits, never corrupt the file), and ``busy_timeout`` makes a blocked
+writer wait instead of failing.
+"""
+
+# Pragmas whose value is a keyword rather than a number
+_KEYWORD_VALUES = {'journal_mode', 'synchronous', 'temp_store', 'locking_mode', 'auto_vacuum'}
+
+
+def pragma_statements(pragmas):
+    """``PRAGMA name = value`` statements for a ``{name: value}`` dict."""
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"Invalid SQLite pragma name: {name!r}")
+        if name in _KEYWORD_VALUES:
+            if not str(value).isalnum():
+                raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+        else:
+            value = int(value)
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def init_command(pragmas):
+    """``OPTIONS['init_command']`` string that applies ``pragmas``."""
+    return '; '.join(pragma_statements(pragmas))
+
+
+def sqlite_options(pragmas, transaction_mode='IMMEDIATE'):
+    """``DATABASES[...]['OPTIONS']`` for a tuned SQLite database."""
+    options = {'init_command': init_command(pragmas), 'transaction_mode': transaction_mode}
+    if 'busy_timeout' in pragmas:
+        # The driver installs its own busy handler on connect; keep it in step
+        options['timeout'] = int(pragmas['busy_timeout']) / 1000
+    return options
+
+
+def current_pragmas(connection, names):
+    """Read back the effective value of each pragma on ``connection``."""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -0,0 +1,242 @@
+"""
+Static export of the public portal, for nginx to serve during traffic spikes.
+
+Every public URL (home, about, contact, list-100, every page of the blog
+list and of each category, every published post, every page of
+note-taking with and without each topic filter) is rendered through the
+real views as an anonymous visitor and written under the output directory:
+
+    /blog/                   -> blog/index.html
+    /blog/?page=2            -> blog/index.page-2.topic-.html
+    /note-taking/?topic=go   -> note-taking/index.page-.topic-go.html
+
+so one ``try_files $uri/index.page-$arg_page.topic-$arg_topic.html
+$uri/index.html`` finds any of them (see DEPLOYMENT.md). Static assets are
+collected into ``static/`` by ``ManifestStaticFilesStorage``, so the pages
+reference content-hashed file names that can be cached forever.
+
+Pages are grouped by what they show (the blog lists, one post, the notes,
+List 100). A build records a fingerprint of each group's data in
+``.static-build.json``; an incremental build re-renders only the groups
+whose fingerprint changed, adds new URLs and removes the files of URLs that
+are gone. A change of templates, static files or markdown configuration
+re-renders everything.
+"""
+
+import hashlib
+import json
+import math
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Count, Max, Q
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .rendering import render_config_fingerprint
+
+
+STATE_FILE = '.static-build.json'
+STATIC_DIR = 'static'
+# Query parameters the public pages read, in file name order
+QUERY_PARAMS = ('page', 'topic')
+
+
+def page_file(url):
+    """Relative file path a public URL is written to."""
+    parts = urlsplit(url)
+    directory = parts.path.strip('/')
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if any(query.get(name) for name in QUERY_PARAMS):
+        name = 'index.%s.html' % '.'.join(f'{param}-{query.get(param, "")}' for param in QUERY_PARAMS)
+    else:
+        name = 'index.html'
+    return os.path.join(directory, name) if directory else name
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _page_count(total, per_page):
+    # An empty list still has its first page
+    return max(1, math.ceil(total / per_page))
+
+
+def _paginated(url, total, per_page, **params):
+    """The bare URL, then ``?page=N`` for every page, with ``params``."""
+    base = '&'.join(f'{name}={value}' for name, value in params.items())
+    urls = [f'{url}?{base}' if base else url]
+    for number in range(1, _page_count(total, per_page) + 1):
+        urls.append(f'{url}?page={number}' + (f'&{base}' if base else ''))
+    return urls
+
+
+def public_pages():
+    """``{url: group}`` for every public page, with ``{group: fingerprint}``."""
+    from blog.models import Category, Post
+    from blog.views import PublicBlogListView
+    from knowledge.models import KnowledgeEntry, Topic
+    from tasks.models import List100Item
+    from .public_views import NOTE_TAKING_PER_PAGE
+
+    pages = {}
+    groups = {}
+    per_page = PublicBlogListView.paginate_by
+
+    published = Post.objects.filter(status='published')
+    state = published.aggregate(latest=Max('updated_at'), total=Count('pk'))
+    categories = list(
+        Category.objects.annotate(published=Count('posts', filter=Q(posts__status='published')))
+        .order_by('pk')
+        .values_list('slug', 'name', 'description', 'published')
+    )
+    groups['blog'] = _digest([state, categories])
+    pages[reverse('home')] = 'blog'
+    for url in _paginated(reverse('blog:post_list'), state['total'], per_page):
+        pages[url] = 'blog'
+    for slug, _name, _description, total in categories:
+        for url in _paginated(reverse('blog:post_list_by_category', args=[slug]), total, per_page):
+            pages[url] = 'blog'
+
+    posts = published.values_list('slug', 'updated_at', 'category__name', 'author__username')
+    for slug, updated_at, category_name, author_name in posts.iterator():
+        group = f'post:{slug}'
+        groups[group] = _digest([updated_at, category_name, author_name])
+        pages[reverse('blog:post_detail', args=[slug])] = group
+
+    public = KnowledgeEntry.objects.filter(status='public')
+    state = public.aggregate(latest=Max('updated_at'), total=Count('pk'))
+    topics = list(
+        Topic.objects.annotate(public=Count('entries', filter=Q(entries__status='public')))
+        .order_by('pk')
+        .values_list('slug', 'name', 'public')
+    )
+    groups['notes'] = _digest([state, topics])
+    note_taking = reverse('note_taking')
+    for url in _paginated(note_taking, state['total'], NOTE_TAKING_PER_PAGE):
+        pages[url] = 'notes'
+    for slug, _name, total in topics:
+        for url in _paginated(note_taking, total, NOTE_TAKING_PER_PAGE, topic=slug):
+            pages[url] = 'notes'
+
+    groups['list100'] = _digest(List100Item.objects.aggregate(latest=Max('updated_at'), total=Count('pk')))
+    pages[reverse('list_100')] = 'list100'
+
+    groups['pages'] = ''
+    pages[reverse('about')] = 'pages'
+    pages[reverse('contact')] = 'pages'
+    return pages, groups
+
+
+def _templates_digest():
+    digest = hashlib.sha1()
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                with open(os.path.join(root, filename), 'rb') as handle:
+                    digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def _write(path, content):
+    # Replace the file in one step so nginx never serves half a page
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as handle:
+        handle.write(content)
+    os.replace(temporary, path)
+
+
+class StaticSiteBuilder:
+    """Render the public portal into ``output``.
+
+    ``build()`` returns ``{'rendered', 'unchanged', 'removed', 'failed'}``
+    where ``failed`` lists ``(url, status)`` pairs. Failed pages keep their
+    previous file, and their group is retried on the next build.
+    """
+
+    def __init__(self, output, incremental=True, host='localhost'):
+        self.output = os.path.abspath(output)
+        self.incremental = incremental
+        self.host = host
+        self.static_root = os.path.join(self.output, STATIC_DIR)
+
+    def _settings(self):
+        return override_settings(
+            # Hashed asset URLs are only used with DEBUG off
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, self.host],
+            STATIC_ROOT=self.static_root,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+            },
+            # Render fresh pages, not the anonymous page caches of the live site
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        )
+
+    def _load_state(self):
+        try:
+            with open(os.path.join(self.output, STATE_FILE)) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def build(self):
+        with self._settings():
+            # Copies only modified files; the manifest maps names to hashed ones
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(self.static_root, 'staticfiles.json'), 'rb') as handle:
+                manifest = handle.read()
+            build_key = _digest([render_config_fingerprint(), _templates_digest(), hashlib.sha1(manifest).hexdigest()])
+
+            previous = self._load_state() if self.incremental else None
+            if previous is not None and previous.get('build') != build_key:
+                previous = None
+            previous_groups = previous['groups'] if previous else {}
+            previous_pages = previous['pages'] if previous else {}
+
+            pages, groups = public_pages()
+            client = Client(raise_request_exception=False, HTTP_HOST=self.host)
+            result = {'rendered': 0, 'unchanged': 0, 'removed': 0, 'failed': []}
+            failed_groups = set()
+            for url, group in pages.items():
+                path = os.path.join(self.output, page_file(url))
+                if (
+                    url in previous_pages
+                    and previous_groups.get(group) == groups[group]
+                    and os.path.exists(path)
+                ):
+                    result['unchanged'] += 1
+                    continue
+                response = client.get(url)
+                if response.status_code != 200:
+                    result['failed'].append((url, response.status_code))
+                    failed_groups.add(group)
+                    continue
+                _write(path, response.content)
+                result['rendered'] += 1
+
+            for url, file in previous_pages.items():
+                if url not in pages:
+                    path = os.path.join(self.output, file)
+                    if os.path.exists(path):
+                        os.remove(path)
+                        result['removed'] += 1
+                        try:
+                            os.removedirs(os.path.dirname(path))
+                        except OSError:
+                            pass  # not empty
+
+            # A group with a failed page is not recorded, so it is retried
+            state = {
+                'build': build_key,
+                'groups': {group: value for group, value in groups.items() if group not in failed_groups},
+                'pages': {url: page_file(url) for url in pages},
+            }
+            _write(os.path.join(self.output, STATE_FILE), json.dumps(state, indent=1).encode('utf-8'))
+        return result
@@ -0,0 +1,185 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import parse_http_date
+
+from blog.models import Post
+from knowledge.forms import TopicForm
+from knowledge.models import Topic
+from .rerender import Rerenderer
+from .slugs import allocate_slug
+from .sqlite import current_pragmas
+from .static_site import StaticSiteBuilder, page_file
+
+
+class StaticSiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer')
+        cls.post = Post.objects.create(
+            title='Hello', slug='hello', author=author, content='# Hello\n\nFirst post.', status='published',
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = directory.name
+
+    def build(self, **kwargs):
+        return StaticSiteBuilder(self.output, **kwargs).build()
+
+    def test_build_exports_post_pages(self):
+        result = self.build()
+        self.assertEqual(result['failed'], [])
+        with open(os.path.join(self.output, page_file('/blog/hello/')), encoding='utf-8') as handle:
+            self.assertIn('First post.', handle.read())
+
+    def test_incremental_build_removes_pages_that_are_gone(self):
+        self.build()
+        self.post.status = 'draft'
+        self.post.save()
+        result = self.build()
+        self.assertEqual(result['removed'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output, page_file('/blog/hello/'))))
+
+        # A page file deleted by hand is not counted again
+        self.post.status = 'published'
+        self.post.save()
+        self.build()
+        os.remove(os.path.join(self.output, page_file('/blog/hello/')))
+        self.post.delete()
+        self.assertEqual(self.build()['removed'], 0)
+
+
+class SlugAllocationTests(TestCase):
+    def test_next_suffix_ignores_longer_slugs(self):
+        for slug in ('rust', 'rust-2', 'rust-lang', 'rust-9x', 'rust-10-notes'):
+            Topic.objects.create(name=slug, slug=slug)
+        self.assertEqual(allocate_slug(Topic.objects.all(), 'rust'), 'rust-3')
+        self.assertEqual(allocate_slug(Topic.objects.all(), 'go'), 'go')
+
+    def test_form_save_retries_after_a_concurrent_create(self):
+        form = TopicForm(data={'name': 'Rust', 'slug': ''})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.instance.slug, 'rust')
+        # Another request takes the slug between validation and save
+        Topic.objects.create(name='Rust (other)', slug='rust')
+        topic = form.save()
+        self.assertEqual(topic.slug, 'rust-1')
+        self.assertEqual(Topic.objects.filter(slug__startswith='rust').count(), 2)
+
+
+class StoredFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer')
+        published_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        cls.old = Post.objects.create(
+            title='Old', slug='old', author=author, content='Old.', status='published', published_at=published_at,
+        )
+        cls.new = Post.objects.create(
+            title='New', slug='new', author=author, content='New.', status='published',
+            published_at=published_at.replace(year=2021),
+        )
+        for post in (cls.old, cls.new):
+            Post.objects.filter(pk=post.pk).update(updated_at=post.published_at)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(FEED_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = reverse('blog:post_feed')
+
+    def test_polls_are_served_from_the_stored_document(self):
+        first = self.client.get(self.url)
+        self.assertContains(first, 'New')
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again['ETag'], first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_last_modified_is_the_generation_time(self):
+        first = self.client.get(self.url)
+        self.assertGreater(parse_http_date(first['Last-Modified']), self.new.published_at.timestamp())
+
+        # Unpublishing the newest post must not move Last-Modified back to the older one
+        self.new.status = 'draft'
+        self.new.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '<title>New</title>')
+        self.assertGreaterEqual(parse_http_date(response['Last-Modified']), parse_http_date(first['Last-Modified']))
+
+
+class Interrupted(Exception):
+    pass
+
+
+class RerenderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('writer')
+        for number in range(6):
+            Post.objects.create(
+                title=f'Post {number}', slug=f'post-{number}', author=author,
+                content=f'# Post {number}\n\n## Part\n\n*Body* of {number}.',
+            )
+
+    def setUp(self):
+        self.expected = self.renderings()
+        Post.objects.update(rendered_html='', rendered_toc='', rendered_headings=[], rendered_key='stale')
+
+    def renderings(self):
+        return list(Post.objects.order_by('pk').values_list(*Post.RENDERED_FIELDS))
+
+    def rerender(self, **kwargs):
+        return Rerenderer([Post], **kwargs).run()
+
+    def test_interrupted_run_resumes_from_stale_rows(self):
+        def stop(model, scanned, total, rendered):
+            raise Interrupted
+
+        # One worker takes four one-row chunks per window
+        with self.assertRaises(Interrupted):
+            self.rerender(workers=1, chunk_size=1, progress=stop)
+        self.assertEqual(Post.objects.exclude(rendered_key='stale').count(), 4)
+
+        # Fresh rows are skipped, so a hand-edited rendering survives
+        fresh = Post.objects.exclude(rendered_key='stale').order_by('pk').first()
+        Post.objects.filter(pk=fresh.pk).update(rendered_html='<p>kept</p>')
+        self.assertEqual(self.rerender(workers=1, chunk_size=1), {'blog.Post': 2})
+        self.assertEqual(Post.objects.get(pk=fresh.pk).rendered_html, '<p>kept</p>')
+        self.assertFalse(Post.objects.filter(rendered_key='stale').exists())
+
+    def test_single_worker_matches_the_pool(self):
+        self.assertEqual(self.rerender(workers=1, chunk_size=2), {'blog.Post': 6})
+        serial = self.renderings()
+        self.assertEqual(serial, self.expected)
+
+        Post.objects.update(rendered_key='stale')
+        self.assertEqual(self.rerender(workers=2, chunk_size=2), {'blog.Post': 6})
+        self.assertEqual(self.renderings(), serial)
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    def test_new_connections_apply_the_configured_pragmas(self):
+        # The test database lives in memory, which has no WAL; open a file
+        # database with the project's connection settings instead
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        default = connections['default']
+        settings_dict = {**default.settings_dict, 'NAME': os.path.join(directory.name, 'pragmas.sqlite3')}
+        database = type(default)(settings_dict, alias='pragmas')
+        self.addCleanup(database.close)
+
+        pragmas = current_pragmas(database, ['journal_mode', 'synchronous', 'busy_timeout'])
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000})
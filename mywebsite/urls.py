@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
+from knowledge.feeds import PublicEntriesAtomFeed, PublicEntriesFeed
 from . import public_views
 
 urlpatterns = [
@@ -29,6 +30,8 @@ urlpatterns = [
     path('', public_views.home, name='home'),
     path('blog/', include('blog.urls', namespace='blog')),
     path('note-taking/', public_views.note_taking, name='note_taking'),
+    path('note-taking/feed/', PublicEntriesFeed(), name='note_taking_feed'),
+    path('note-taking/feed/atom/', PublicEntriesAtomFeed(), name='note_taking_feed_atom'),
     path('list-100/', public_views.list_100, name='list_100'),
     path('about/', public_views.about, name='about'),
     path('contact/', public_views.contact, name='contact'),
@@ -62,13 +62,12 @@ class EntryTreeDragDrop {
         const target = e.target.closest('.entry-tree-item');
         if (!target || target === this.draggedElement) return false;
 
-        const droppedEntryId = target.dataset.entryId;
-        
         // Reorganize in DOM
-        target.parentNode.insertBefore(this.draggedElement, target);
+        const container = target.parentNode;
+        container.insertBefore(this.draggedElement, target);
         
-        // Update order via API
-        this.updateOrder(this.draggedId, droppedEntryId);
+        // Save the new order of every sibling in one request
+        this.updateOrder(container);
 
         return false;
     }
@@ -84,17 +83,28 @@ class EntryTreeDragDrop {
         });
     }
 
-    async updateOrder(draggedId, targetId) {
+    collectChanges(container) {
+        const parentItem = container.closest('.entry-tree-item');
+        const parentId = parentItem ? parseInt(parentItem.dataset.entryId, 10) : null;
+        const siblings = Array.from(container.children)
+            .filter(el => el.classList.contains('entry-tree-item'));
+
+        return siblings.map((item, index) => ({
+            id: parseInt(item.dataset.entryId, 10),
+            parent: parentId,
+            order: index,
+        }));
+    }
+
+    async updateOrder(container) {
         try {
-            const response = await fetch(`/api/knowledge-entries/${draggedId}/reorder/`, {
-                method: 'PATCH',
+            const response = await fetch('/api/knowledge-entries/reorder/', {
+                method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': this.getCsrfToken(),
                 },
-                body: JSON.stringify({
-                    order: 0,  // Will be recalculated on backend
-                })
+                body: JSON.stringify(this.collectChanges(container))
             });
 
             if (!response.ok) {
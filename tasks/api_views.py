@@ -1,11 +1,13 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from mywebsite.conditional import ConditionalGetMixin
+from mywebsite.sparse_fields import SparseFieldsViewMixin
 from .models import Task, StudySession
 from .serializers import TaskSerializer, StudySessionSerializer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -13,12 +15,14 @@ class TaskViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description']
     ordering_fields = ['due_date', 'priority', 'created_at']
     ordering = ['due_date', '-priority']
+    cursor_ordering = '-updated_at'
+    conditional_related = ('user',)
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        return Task.objects.filter(user=self.request.user).select_related('user')
 
 
-class StudySessionViewSet(viewsets.ModelViewSet):
+class StudySessionViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = StudySessionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -26,6 +30,7 @@ class StudySessionViewSet(viewsets.ModelViewSet):
     search_fields = ['subject', 'description', 'notes']
     ordering_fields = ['date', 'duration_minutes', 'created_at']
     ordering = ['-date']
+    cursor_ordering = '-created_at'
 
     def get_queryset(self):
-        return StudySession.objects.filter(user=self.request.user)
+        return StudySession.objects.filter(user=self.request.user).select_related('user')
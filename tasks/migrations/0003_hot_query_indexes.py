@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 17:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_list100item'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['user', 'date'], name='session_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='session_user_created_idx'),
+        ),
+    ]
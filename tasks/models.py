@@ -35,6 +35,12 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['due_date', '-priority', '-created_at']
+        indexes = [
+            # Dashboard and list filters: a user's tasks by status and due date
+            models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+            # API keyset pages
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -50,6 +56,11 @@ class StudySession(models.Model):
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='session_user_date_idx'),
+            # API keyset pages
+            models.Index(fields=['user', 'created_at', 'id'], name='session_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.date}"
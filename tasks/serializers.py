@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from mywebsite.sparse_fields import SparseFieldsSerializerMixin
 from .models import Task, StudySession
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
@@ -19,7 +20,7 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class StudySessionSerializer(serializers.ModelSerializer):
+class StudySessionSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
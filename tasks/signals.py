@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from mywebsite.dashboard import invalidate_dashboard_stats
+from mywebsite.page_cache import invalidate_list100_page
+from .models import List100Item, Task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=List100Item)
+@receiver(post_delete, sender=List100Item)
+def refresh_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=List100Item)
+@receiver(post_delete, sender=List100Item)
+def refresh_list100_page(sender, **kwargs):
+    invalidate_list100_page()
@@ -0,0 +1,31 @@
+"""
+List 100 counters.
+
+Total and per-status counts come from one conditional aggregate.
+"""
+
+from django.db.models import Count, Q
+
+from .models import List100Item
+
+
+def _status_counts():
+    return {
+        status: Count('pk', filter=Q(status=status))
+        for status, _label in List100Item.STATUS_CHOICES
+    }
+
+
+def list100_stats(queryset=None):
+    """``total`` plus one counter per status, in a single query."""
+    if queryset is None:
+        queryset = List100Item.objects.all()
+    return queryset.order_by().aggregate(total=Count('pk'), **_status_counts())
+
+
+async def alist100_stats(queryset=None):
+    """``list100_stats()`` through the async ORM."""
+    if queryset is None:
+        queryset = List100Item.objects.all()
+    return await queryset.order_by().aaggregate(total=Count('pk'), **_status_counts())
+
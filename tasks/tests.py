@@ -1,3 +1,71 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import List100Item, StudySession
+
+
+class List100PageCacheTests(TestCase):
+    def setUp(self):
+        self.item = List100Item.objects.create(title='Learn to sail')
+        self.url = reverse('list_100')
+
+    def test_anonymous_page_is_cached_until_an_item_changes(self):
+        self.assertContains(self.client.get(self.url), 'Learn to sail')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), 'Learn to sail')
+
+        self.item.title = 'Learn to dive'
+        self.item.save()
+        self.assertContains(self.client.get(self.url), 'Learn to dive')
+
+        self.item.delete()
+        self.assertNotContains(self.client.get(self.url), 'Learn to dive')
+
+    def test_pending_flash_message_skips_the_cache(self):
+        self.client.get(self.url)
+        self.client.cookies[CookieStorage.cookie_name] = 'pending'
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+
+class StudySessionKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student')
+        now = timezone.now()
+        # Three sessions share a timestamp so pages must break ties on pk
+        stamps = [now, now, now, now - timedelta(hours=1), now - timedelta(hours=2)]
+        for index, stamp in enumerate(stamps):
+            session = StudySession.objects.create(user=cls.user, subject=f'Session {index}', duration_minutes=30)
+            StudySession.objects.filter(pk=session.pk).update(created_at=stamp)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('studysession-list')
+
+    def test_cursor_pages_cover_every_row_once_in_order(self):
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 2}).json()
+        self.assertNotIn('count', response)
+        seen = [row['id'] for row in response['results']]
+        while response['next']:
+            response = self.client.get(response['next']).json()
+            seen.extend(row['id'] for row in response['results'])
+        expected = list(StudySession.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ('not-base64!', 'WyJ4Il0=', 'WyJub3QgYSBkYXRlIiwgMV0='):
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
 
-# Create your tests here.
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get(self.url, {'page_size': 2}).json()
+        self.assertEqual(response['count'], 5)
+        self.assertEqual(len(response['results']), 2)
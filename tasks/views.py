@@ -6,6 +6,7 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from .models import Task, StudySession, List100Item
 from .forms import TaskForm, StudySessionForm
+from .stats import list100_stats
 from datetime import date
 from django.utils import timezone
 
@@ -156,15 +157,9 @@ class StudySessionDeleteView(LoginRequiredMixin, DeleteView):
 def list100_admin(request):
     """Admin page for managing 100 list items"""
     items = List100Item.objects.all()
-    stats = {
-        'total': items.count(),
-        'not_started': items.filter(status='not_started').count(),
-        'in_progress': items.filter(status='in_progress').count(),
-        'completed': items.filter(status='completed').count(),
-    }
     return render(request, 'admin_portal/list100_admin.html', {
         'items': items,
-        'stats': stats,
+        'stats': list100_stats(),
     })
 
 